@@ -1,15 +1,27 @@
+import logging
+import time
 from enum import Enum
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Optional
 import streamlit as st
-from langchain_core.prompts import ChatPromptTemplate
-from langchain.agents import create_tool_calling_agent, AgentExecutor
-from langchain.chains import RetrievalQA
-from config.settings import get_llm_model
+from config.settings import (
+    get_llm_model, get_index_store, get_response_cache, get_reranker,
+    ROUTER_RELEVANCE_THRESHOLD, ROUTER_LEXICAL_THRESHOLD, HYBRID_ALPHA, RETRIEVAL_FETCH_K, RETRIEVAL_MAX_K,
+    CONTEXT_TOKEN_BUDGET, MEMORY_TOKEN_CAP, MEMORY_WINDOW_TURNS, MEMORY_SUMMARIZER
+)
 from utils.document_processor import DocumentProcessor
-from utils.validators import Validators
+from utils.context_packer import ContextPacker, estimate_tokens
+from utils.hybrid_retriever import HybridRetriever
+from utils.index_manager import IndexManager
 from tools.booking import book_appointment_tool
 from tools.user_input import validate_user_input_tool
+from agents.intents import SlotExtractor
+from agents.memory import ConversationMemory, LLMSummarizer, extractive_summary
+from agents.router import QueryRouter, Route, RouteDecision
+from agents.streaming import ResponseStream, astream_text, iter_async
+from utils.telemetry import TokenUsageHandler, get_telemetry
+
+logger = logging.getLogger(__name__)
 
 class ConversationState(Enum):
     GENERAL = "general"
@@ -23,18 +35,36 @@ class UserInfo:
     email: Optional[str] = None
     appointment_date: Optional[str] = None
 
-class ChatbotAgent:
-    def __init__(self):
-        self.llm = get_llm_model()
-        self.doc_processor = DocumentProcessor()
-        self.vectorstore = None
-        self.qa_chain = None
-        self.tools = [book_appointment_tool, validate_user_input_tool]
-        self.agent_executor = self._create_agent()
-    
-    def _create_agent(self):
-        """Create the agent with tools"""
-        system_message = """You are an intelligent assistant that can:
+BOOKING_FIELDS = ('name', 'phone', 'email', 'appointment_date')
+
+# Question for each missing field: (when starting a booking, mid-conversation)
+BOOKING_PROMPTS = {
+    'name': ("What's your full name?",
+             "Could you please tell me your full name?"),
+    'phone': ("Could you please provide your phone number?",
+              "Great! Now, could you please provide your phone number?"),
+    'email': ("Please provide your email address.",
+              "Perfect! Now, please provide your email address."),
+    'appointment_date': ("When would you like to schedule the appointment? (e.g., 'next Monday', 'tomorrow', or '2024-12-25')",
+                         "Excellent! Finally, when would you like to schedule the appointment? (e.g., 'next Monday', 'tomorrow', or '2024-12-25')"),
+}
+
+BOOKING_ERRORS = {
+    'name': "Please tell me your full name.",
+    'phone': "Please provide a valid phone number (e.g., +91XXXXXXXXXX or 10-digit number).",
+    'email': "Please provide a valid email address (e.g., user@example.com).",
+    'appointment_date': "I couldn't understand the date. Please specify when you'd like to book (e.g., 'next Monday', 'tomorrow', or '2024-12-25').",
+}
+
+SMALLTALK_REPLIES = {
+    "greeting": ("Hello! I can answer questions about your uploaded documents, "
+                 "or book an appointment for you — just say \"call me\"."),
+    "thanks": "You're welcome! Let me know if there's anything else I can help with.",
+    "farewell": "Goodbye! Come back any time you have more questions.",
+    "acknowledgement": "Let me know if there's anything else I can help with.",
+}
+
+SYSTEM_MESSAGE = """You are an intelligent assistant that can:
 1. Answer questions from uploaded documents
 2. Help users book appointments by collecting their information
 3. Validate user inputs (email, phone, dates)
@@ -45,101 +75,378 @@ Extract dates in YYYY-MM-DD format from natural language (e.g., "next Monday" 
 
 Be conversational and helpful. Guide users through the process step by step.
 """
-        
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_message),
-            ("human", "{input}"),
-            ("placeholder", "{agent_scratchpad}")
-        ])
-        
-        agent = create_tool_calling_agent(self.llm, self.tools, prompt)
-        return AgentExecutor(agent=agent, tools=self.tools, verbose=True)
+
+# The prompt of LangChain's former "stuff" QA chain for chat models
+DOCUMENT_QA_PROMPT = """Use the following pieces of context to answer the user's question.
+If you don't know the answer, just say that you don't know, don't try to make up an answer.
+----------------
+{context}"""
+
+def create_agent_executor(llm, tools):
+    """Create the agent with tools"""
+    # LangChain's agent and chain modules take about a second to import;
+    # load them when the first session needs them, not at app start
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain.agents import create_tool_calling_agent, AgentExecutor
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_MESSAGE),
+        ("placeholder", "{chat_history}"),
+        ("human", "{input}"),
+        ("placeholder", "{agent_scratchpad}")
+    ])
     
-    def load_documents(self, uploaded_files):
-        """Load and process documents"""
-        self.vectorstore = self.doc_processor.process_documents(uploaded_files)
-        if self.vectorstore:
-            self.qa_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=self.vectorstore.as_retriever(search_kwargs={"k": 3}),
-                return_source_documents=False
-            )
-            return True
-        return False
+    agent = create_tool_calling_agent(llm, tools, prompt)
+    return AgentExecutor(agent=agent, tools=tools, verbose=True, return_intermediate_steps=True)
+
+def create_document_chain(llm):
+    """Chain answering a question from the documents passed as `context`"""
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain.chains.combine_documents import create_stuff_documents_chain
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", DOCUMENT_QA_PROMPT),
+        ("human", "{question}"),
+    ])
+    return create_stuff_documents_chain(llm, prompt)
+
+@dataclass(frozen=True)
+class AgentResources:
+    """Immutable components shared by every session in the process.
+
+    None of these hold per-user state, so they are built once (see
+    get_agent_resources) and used concurrently by all sessions.
+    """
+    llm: Any
+    tools: tuple
+    # langchain.agents.AgentExecutor
+    agent_executor: Any
+    # "Stuff" chain answering from retrieved chunks; corpus independent
+    document_chain: Any
+    router: QueryRouter
+    # Fits retrieved chunks into the prompt's token budget
+    context_packer: ContextPacker
+    slot_extractor: SlotExtractor
+    response_cache: Any
+    # Folds turns leaving the conversation window into its summary
+    summarizer: Any
+
+    @classmethod
+    def build(cls, llm=None, bookings: bool = True) -> "AgentResources":
+        """Build the shared components; without `bookings` nothing can book an appointment"""
+        llm = llm or get_llm_model()
+        telemetry = get_telemetry()
+        # Token usage of every call, whichever chain makes it; the LLM may be
+        # shared with earlier builds, so the handler is attached only once
+        callbacks = list(llm.callbacks or [])
+        if not any(isinstance(handler, TokenUsageHandler) for handler in callbacks):
+            llm.callbacks = [*callbacks, TokenUsageHandler(telemetry)]
+        response_cache = get_response_cache()
+        telemetry.watch_cache("response", response_cache.stats)
+        tools = (book_appointment_tool, validate_user_input_tool) if bookings else (validate_user_input_tool,)
+        return cls(
+            llm=llm,
+            tools=tools,
+            agent_executor=create_agent_executor(llm, list(tools)),
+            document_chain=create_document_chain(llm),
+            router=QueryRouter(
+                relevance_threshold=ROUTER_RELEVANCE_THRESHOLD,
+                lexical_threshold=ROUTER_LEXICAL_THRESHOLD,
+                retriever=HybridRetriever(
+                    alpha=HYBRID_ALPHA,
+                    fetch_k=RETRIEVAL_FETCH_K,
+                    max_k=RETRIEVAL_MAX_K,
+                    reranker=get_reranker(),
+                ),
+                bookings=bookings,
+            ),
+            context_packer=ContextPacker(CONTEXT_TOKEN_BUDGET),
+            slot_extractor=SlotExtractor(),
+            response_cache=response_cache,
+            summarizer=LLMSummarizer(llm) if MEMORY_SUMMARIZER == "llm" else extractive_summary,
+        )
+
+@st.cache_resource
+def get_agent_resources() -> AgentResources:
+    return AgentResources.build()
+
+def _new_memory() -> ConversationMemory:
+    return ConversationMemory(MEMORY_TOKEN_CAP, MEMORY_WINDOW_TURNS)
+
+@dataclass
+class SessionContext:
+    """Per-session documents, conversation memory and booking progress"""
+    doc_processor: DocumentProcessor
+    index_manager: IndexManager
+    vectorstore: Optional[Any] = None
+    memory: ConversationMemory = field(default_factory=_new_memory)
+    user_info: UserInfo = field(default_factory=UserInfo)
+    conversation_state: ConversationState = ConversationState.GENERAL
+
+    def reset_conversation(self) -> None:
+        """Forget the conversation and any booking in progress; keep the documents"""
+        self.memory.clear()
+        self.user_info = UserInfo()
+        self.conversation_state = ConversationState.GENERAL
+
+    @classmethod
+    def create(cls, index_store=None) -> "SessionContext":
+        doc_processor = DocumentProcessor()
+        return cls(doc_processor, IndexManager(doc_processor, index_store or get_index_store()))
+
+class ChatbotAgent:
+    """Per-session chatbot: shared AgentResources plus a SessionContext"""
+
+    def __init__(self, resources: Optional[AgentResources] = None, session: Optional[SessionContext] = None):
+        self._resources = resources
+        self.session = session or SessionContext.create()
+
+    @property
+    def resources(self) -> AgentResources:
+        # The LLM and agent are built on the first message, not with the session
+        if self._resources is None:
+            self._resources = get_agent_resources()
+        return self._resources
+
+    @property
+    def vectorstore(self):
+        return self.session.vectorstore
+    
+    def load_documents(self, uploaded_files, progress_callback=None):
+        """Load and process documents, re-indexing only what changed"""
+        doc_processor, index_manager = self.session.doc_processor, self.session.index_manager
+        doc_processor.progress_callback = progress_callback
+        try:
+            index_manager.sync(uploaded_files)
+        finally:
+            doc_processor.progress_callback = None
+
+        self.session.vectorstore = index_manager.vectorstore
+        return self.session.vectorstore is not None
     
-    def get_response(self, query: str, user_info: UserInfo, conversation_state: ConversationState) -> tuple:
+    def get_response(self, query: str) -> str:
         """Get response from the chatbot"""
+        with get_telemetry().span("chat.turn"):
+            response = self._get_response(query)
+            self._remember(query, response)
+            return response
+
+    def _get_response(self, query: str) -> str:
+        decision = self._route(query)
+        early = self._handle_conversation_flow(query, decision)
+        if early is not None:
+            return early
         
-        # Check if user is asking to book appointment or call
-        call_keywords = ['call me', 'book appointment', 'schedule appointment', 'book a call', 'contact me']
-        if any(keyword in query.lower() for keyword in call_keywords):
-            conversation_state = ConversationState.COLLECTING_INFO
-            return "I'd be happy to help you book an appointment! Let me collect some information from you. What's your full name?", conversation_state
+        # Serve repeated questions about the same documents from the cache
+        namespace = self._cache_namespace(decision)
+        query_vector = self._embed_query(query) if namespace is not None else None
+        if query_vector is not None:
+            cached = self.resources.response_cache.lookup(namespace, query_vector)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        response, cacheable = self._answer(query, decision)
+        elapsed = time.perf_counter() - started
+        self._log_answer(decision, elapsed)
+        if cacheable and query_vector is not None:
+            self.resources.response_cache.store(namespace, query_vector, response, elapsed)
+        return response
+
+    def stream_response(self, query: str) -> ResponseStream:
+        """Streaming variant of get_response yielding the answer token by token"""
+        decision = self._route(query)
+        early = self._handle_conversation_flow(query, decision)
+        if early is not None:
+            return ResponseStream(self._remembered(query, [early]))
+
+        namespace = self._cache_namespace(decision)
+        query_vector = self._embed_query(query) if namespace is not None else None
+        if query_vector is not None:
+            cached = self.resources.response_cache.lookup(namespace, query_vector)
+            if cached is not None:
+                return ResponseStream(self._remembered(query, [cached]))
+
+        return ResponseStream(self._remembered(query, self._stream_answer(query, decision, namespace, query_vector)))
+
+    def _remember(self, query: str, response: str) -> None:
+        with get_telemetry().span("memory.update"):
+            self.session.memory.add_turn(query, response, self.resources.summarizer)
+
+    def _remembered(self, query: str, pieces):
+        """Pass response pieces through, then record the whole turn"""
+        parts = []
+        for piece in pieces:
+            parts.append(piece)
+            yield piece
+        self._remember(query, "".join(parts))
+
+    def _agent_inputs(self, query: str) -> dict:
+        # Bounded history: the summary of older turns plus the recent ones
+        return {"input": query, "chat_history": self.session.memory.messages()}
+
+    def _route(self, query: str) -> RouteDecision:
+        return self.resources.router.route(
+            query,
+            self.session.conversation_state == ConversationState.COLLECTING_INFO,
+            self.vectorstore,
+            self.session.index_manager.lexical_index
+        )
+
+    def _handle_conversation_flow(self, query: str, decision: RouteDecision) -> Optional[str]:
+        """Handle booking, info collection and small talk locally; None for other queries"""
+        if decision.route == Route.BOOKING:
+            return self._handle_info_collection(query, starting=True)
         
         # Handle information collection state
-        if conversation_state == ConversationState.COLLECTING_INFO:
-            return self._handle_info_collection(query, user_info)
-        
-        # Try to answer from documents first
-        if self.qa_chain:
+        if decision.route == Route.COLLECTING:
+            return self._handle_info_collection(query)
+
+        if decision.route == Route.SMALLTALK:
+            kind = self.resources.router.intent_matcher.smalltalk_kind(query)
+            return SMALLTALK_REPLIES[kind]
+        return None
+
+    def _log_answer(self, decision: RouteDecision, elapsed: float) -> None:
+        logger.info(
+            "Answered via %s route: routing %.1f ms, answer %.1f ms",
+            decision.route.value, decision.elapsed * 1000, elapsed * 1000
+        )
+
+    def _cache_namespace(self, decision: RouteDecision) -> Optional[str]:
+        """Response cache namespace for the current corpus, None if uncacheable"""
+        if decision.route != Route.DOCUMENT and self.session.memory.messages():
+            # The agent answers in the context of the conversation so far;
+            # document answers only see the retrieved context and the question
+            return None
+        if self.vectorstore is None:
+            return ""
+        # Without a fingerprint the corpus is only partially indexed
+        return self.session.index_manager.fingerprint
+
+    def _embed_query(self, query: str):
+        try:
+            return self.session.doc_processor.get_embedding_function().embed_query(query)
+        except Exception:
+            # The cache is an optimization; answer without it
+            return None
+
+    def _document_inputs(self, query: str, decision: RouteDecision) -> dict:
+        # Reuse the router's retrieval instead of running the retriever again
+        documents = self.resources.context_packer.pack(decision.documents)
+        telemetry = get_telemetry()
+        retrieved = sum(estimate_tokens(doc.page_content) for doc in decision.documents)
+        packed = sum(estimate_tokens(doc.page_content) for doc in documents)
+        telemetry.count("context_tokens_total", packed)
+        telemetry.count("context_tokens_saved_total", retrieved - packed)
+        return {"context": documents, "question": query}
+
+    def _answer(self, query: str, decision: RouteDecision) -> tuple:
+        """Answer on the routed path; returns (response, cacheable)"""
+        if decision.route == Route.DOCUMENT:
             try:
-                doc_response = self.qa_chain.run(query)
-                if doc_response and "I don't know" not in doc_response:
-                    return doc_response, conversation_state
+                inputs = self._document_inputs(query, decision)
+                with get_telemetry().span("qa_llm"):
+                    return self.resources.document_chain.invoke(inputs), True
             except Exception as e:
                 st.error(f"Error querying documents: {str(e)}")
         
         # Use agent for general queries
         try:
-            response = self.agent_executor.invoke({"input": query})
-            return response.get("output", "I'm sorry, I couldn't process your request."), conversation_state
+            inputs = self._agent_inputs(query)
+            with get_telemetry().span("agent"):
+                response = self.resources.agent_executor.invoke(inputs)
+            # Answers that involved tool calls (e.g. bookings) or that may
+            # depend on earlier turns must not be replayed
+            cacheable = ("output" in response and not response.get("intermediate_steps")
+                         and not inputs["chat_history"])
+            return response.get("output", "I'm sorry, I couldn't process your request."), cacheable
         except Exception as e:
-            return f"I encountered an error: {str(e)}", conversation_state
-    
-    def _handle_info_collection(self, query: str, user_info: UserInfo) -> tuple:
-        """Handle the information collection process"""
-        
-        # Determine what information we're collecting
-        if not user_info.name:
-            user_info.name = query.strip()
-            return "Great! Now, could you please provide your phone number?", ConversationState.COLLECTING_INFO
-        
-        elif not user_info.phone:
-            if Validators.validate_phone(query):
-                user_info.phone = query.strip()
-                return "Perfect! Now, please provide your email address.", ConversationState.COLLECTING_INFO
-            else:
-                return "Please provide a valid phone number (e.g., +91XXXXXXXXXX or 10-digit number).", ConversationState.COLLECTING_INFO
-        
-        elif not user_info.email:
-            if Validators.validate_email(query):
-                user_info.email = query.strip()
-                return "Excellent! Finally, when would you like to schedule the appointment? (e.g., 'next Monday', 'tomorrow', or '2024-12-25')", ConversationState.COLLECTING_INFO
-            else:
-                return "Please provide a valid email address (e.g., user@example.com).", ConversationState.COLLECTING_INFO
+            return f"I encountered an error: {str(e)}", False
+
+    def _stream_answer(self, query: str, decision: RouteDecision, namespace: Optional[str], query_vector):
+        """Streaming counterpart of _answer, caching the full answer when done"""
+        started = time.perf_counter()
+        parts = []
+        tools_used = []
+        route = decision.route
+        cacheable = True
+
+        if route == Route.DOCUMENT:
+            try:
+                inputs = self._document_inputs(query, decision)
+                for token in iter_async(lambda: astream_text(self.resources.document_chain, inputs)):
+                    parts.append(token)
+                    yield token
+            except Exception as e:
+                st.error(f"Error querying documents: {str(e)}")
+                # Fall back to the agent, as _answer does; a document answer
+                # cut short and completed by the agent is not cached
+                route, cacheable = Route.AGENT, not parts
+
+        if route != Route.DOCUMENT:
+            inputs = self._agent_inputs(query)
+            try:
+                for token in iter_async(lambda: astream_text(self.resources.agent_executor, inputs, tools_used)):
+                    parts.append(token)
+                    yield token
+            except Exception as e:
+                yield f"I encountered an error: {str(e)}"
+                return
+            cacheable = cacheable and not tools_used and not inputs["chat_history"]
+
+        elapsed = time.perf_counter() - started
+        self._log_answer(decision, elapsed)
+        get_telemetry().observe("qa_llm" if route == Route.DOCUMENT else "agent", elapsed)
+        if not parts:
+            yield "I'm sorry, I couldn't process your request."
+        elif cacheable and query_vector is not None:
+            self.resources.response_cache.store(namespace, query_vector, "".join(parts), elapsed)
+
+    def _handle_info_collection(self, query: str, starting: bool = False) -> str:
+        """Handle the information collection process.
+
+        Every field found in the message is filled at once, so a single
+        message can complete several steps (or the whole booking).
+        """
+        user_info = self.session.user_info
+        expected = next((field for field in BOOKING_FIELDS if not getattr(user_info, field)), None)
+        slots = self.resources.slot_extractor.extract(query)
+
+        # A bare reply to "What's your full name?" is the name itself
+        if expected == 'name' and not starting and not slots:
+            slots['name'] = query.strip()
+
+        filled = False
+        for slot, value in slots.items():
+            if not getattr(user_info, slot):
+                setattr(user_info, slot, value)
+                filled = True
+
+        missing = next((field for field in BOOKING_FIELDS if not getattr(user_info, field)), None)
+        if missing is None:
+            self.session.conversation_state = ConversationState.GENERAL
+            return self._book_appointment(user_info)
+
+        self.session.conversation_state = ConversationState.COLLECTING_INFO
+        if starting:
+            prompt = BOOKING_PROMPTS[missing][0]
+            return f"I'd be happy to help you book an appointment! Let me collect some information from you. {prompt}"
+        if not filled:
+            # Nothing usable for the field we asked for
+            return BOOKING_ERRORS[expected]
+        return BOOKING_PROMPTS[missing][1]
+
+    def _book_appointment(self, user_info: UserInfo) -> str:
+        # Book the appointment using the tool
+        booking_result = book_appointment_tool.invoke({
+            'name': user_info.name,
+            'phone': user_info.phone,
+            'email': user_info.email,
+            'appointment_date': user_info.appointment_date
+        })
         
-        elif not user_info.appointment_date:
-            parsed_date = Validators.parse_date_from_text(query)
-            if parsed_date:
-                user_info.appointment_date = parsed_date
-                
-                # Book the appointment using the tool
-                booking_result = book_appointment_tool.invoke({
-                    'name': user_info.name,
-                    'phone': user_info.phone,
-                    'email': user_info.email,
-                    'appointment_date': user_info.appointment_date
-                })
-                
-                # Reset user info for next interaction
-                user_info.name = None
-                user_info.phone = None
-                user_info.email = None
-                user_info.appointment_date = None
-                
-                return booking_result, ConversationState.GENERAL
-            else:
-                return "I couldn't understand the date. Please specify when you'd like to book (e.g., 'next Monday', 'tomorrow', or '2024-12-25').", ConversationState.COLLECTING_INFO
+        # Reset user info for next interaction
+        self.session.user_info = UserInfo()
         
-        return "Thank you for the information!", ConversationState.GENERAL
+        return booking_result
@@ -0,0 +1,123 @@
+import re
+from enum import Enum
+from typing import Dict, Optional
+
+from utils.validators import MONTHS, WEEKDAYS, Validators
+
+
+class Intent(Enum):
+    BOOKING = "booking"
+    SMALLTALK = "smalltalk"
+    QA = "qa"
+
+
+class IntentMatcher:
+    """Local, regex-based intent classifier for chat messages.
+
+    Each intent is one precompiled alternation, so classifying a message is
+    a couple of regex scans and never needs an LLM call.
+    """
+
+    # Only first-person requests or requests addressed to the bot count, so
+    # questions like "how can customers contact us?" stay document questions
+    _BOOKING_VERB = r"(?:book|schedule|arrange|set\s+up|fix|get)"
+    _BOOKING_OBJECT = r"(?:an?\s+(?:appointment|call|meeting|consultation|call\s*back)|appointments?|consultation|call\s*back)"
+    BOOKING_PATTERN = re.compile(
+        r"\b(?:"
+        r"(?:call|ring|phone|contact|reach)\s+me"
+        r"|get\s+in\s+touch\s+with\s+me"
+        # "I'd like to book a call", "we want a callback", "I need an appointment"
+        r"|(?:i|we)\s*(?:['\u2019]?d\s+like|['\u2019]?d\s+love|would\s+like|would\s+love|want|wanna|need)\s+"
+        rf"(?:to\s+(?:{_BOOKING_VERB}\s+|make\s+(?=an?\s+appointment))|me\s+)?{_BOOKING_OBJECT}"
+        # "book me a call", "please schedule a call", "can you arrange a meeting"
+        rf"|{_BOOKING_VERB}\s+me\s+{_BOOKING_OBJECT}"
+        rf"|(?:please|(?:can|could|would)\s+you)\s+(?:please\s+)?{_BOOKING_VERB}\s+(?:me\s+)?{_BOOKING_OBJECT}"
+        r")\b",
+        re.IGNORECASE
+    )
+    SMALLTALK_PATTERN = re.compile(
+        r"^\W*(?:hi|hello|hey|hiya|namaste|yo|good\s+(?:morning|afternoon|evening)"
+        r"|thanks|thank\s+you|thank\s+you\s+so\s+much|thx|ok(?:ay)?|cool|great"
+        r"|bye|goodbye|see\s+you|how\s+are\s+you(?:\s+doing)?|who\s+are\s+you"
+        r"|what\s+can\s+you\s+do)(?:\s+(?:there|bot|again|a\s+lot))?\W*$",
+        re.IGNORECASE
+    )
+    THANKS_PATTERN = re.compile(r"\b(?:thanks|thank\s+you|thx)\b", re.IGNORECASE)
+    FAREWELL_PATTERN = re.compile(r"\b(?:bye|goodbye|see\s+you)\b", re.IGNORECASE)
+    ACKNOWLEDGEMENT_PATTERN = re.compile(r"^\W*(?:ok(?:ay)?|cool|great)\W*$", re.IGNORECASE)
+
+    def classify(self, text: str) -> Intent:
+        if self.BOOKING_PATTERN.search(text):
+            return Intent.BOOKING
+        if self.SMALLTALK_PATTERN.match(text):
+            return Intent.SMALLTALK
+        return Intent.QA
+
+    def smalltalk_kind(self, text: str) -> str:
+        """Kind of a small-talk message: greeting, thanks, farewell or acknowledgement"""
+        if self.THANKS_PATTERN.search(text):
+            return "thanks"
+        if self.FAREWELL_PATTERN.search(text):
+            return "farewell"
+        if self.ACKNOWLEDGEMENT_PATTERN.match(text):
+            return "acknowledgement"
+        return "greeting"
+
+
+class SlotExtractor:
+    """Extract booking fields (name, phone, email, date) from one message"""
+
+    EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+    PHONE_PATTERN = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+    # "my name is" and "name:" take the words as written; after "I am" or
+    # "this is" only capitalized words count. Names end at punctuation.
+    NAME_PATTERN = re.compile(
+        r"\b(?:(?P<explicit>my\s+name\s+is\b|name\s*[:\-])|(?:i\s*'?\s*a?m|this\s+is)\b)\s*"
+        r"(?P<name>[A-Za-z][A-Za-z'-]*(?:[ \t]+[A-Za-z][A-Za-z'-]*){0,3})",
+        re.IGNORECASE
+    )
+    # Words that end a name: dates, and what usually follows "I am" or the name
+    NOT_NAME_WORDS = frozenset([
+        *MONTHS, *WEEKDAYS, "today", "tonight", "tomorrow", "tmrw", "yesterday", "next", "this",
+        "coming", "day", "week", "weekend", "morning", "afternoon", "evening", "asap", "now", "soon",
+        "later", "available", "free", "busy", "interested", "looking", "ready", "here", "fine",
+        "good", "sorry", "not", "also", "just", "calling", "writing", "and", "or", "but", "my", "i",
+        "call", "please", "phone", "number", "email", "at", "on", "from", "with", "for", "to", "in",
+    ])
+
+    def extract(self, text: str) -> Dict[str, str]:
+        slots = {}
+        remaining = text
+
+        email = self.EMAIL_PATTERN.search(remaining)
+        if email:
+            slots["email"] = email.group(0)
+            remaining = remaining.replace(email.group(0), " ")
+
+        for match in self.PHONE_PATTERN.finditer(remaining):
+            if Validators.validate_phone(match.group(0)):
+                slots["phone"] = match.group(0).strip()
+                remaining = remaining.replace(match.group(0), " ")
+                break
+
+        # Dates first, so "I am free Monday" cannot lose the date to the name
+        date = Validators.parse_date_from_text(remaining)
+        if date:
+            slots["appointment_date"] = date
+
+        name = self.extract_name(remaining)
+        if name:
+            slots["name"] = name
+        return slots
+
+    def extract_name(self, text: str) -> Optional[str]:
+        for match in self.NAME_PATTERN.finditer(text):
+            explicit = match.group("explicit") is not None
+            words = []
+            for word in match.group("name").split():
+                if word.lower() in self.NOT_NAME_WORDS or not (explicit or word[0].isupper()):
+                    break
+                words.append(word)
+            if words:
+                return " ".join(words)
+        return None
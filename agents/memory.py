@@ -0,0 +1,124 @@
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, List, Tuple
+
+from utils.context_packer import estimate_tokens, truncate_tokens
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a user and an assistant.
+Keep facts the assistant may need later (names, dates, requests, decisions). Reply with the summary only, in at most {words} words.
+
+Current summary:
+{summary}
+
+New turns:
+{turns}
+"""
+
+
+@dataclass
+class Turn:
+    user: str
+    assistant: str
+
+
+# (current summary, turns leaving the window, token budget) -> new summary
+Summarizer = Callable[[str, List[Turn], int], str]
+
+
+def _first_sentence(text: str, budget: int) -> str:
+    return truncate_tokens(SENTENCE_END.split(text.strip(), maxsplit=1)[0], budget)
+
+
+def extractive_summary(summary: str, turns: List[Turn], budget: int) -> str:
+    """Append one line per turn, dropping the oldest lines to stay in budget; no LLM call"""
+    lines = summary.splitlines() if summary else []
+    for turn in turns:
+        lines.append(f"User: {_first_sentence(turn.user, 30)} / Assistant: {_first_sentence(turn.assistant, 30)}")
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > budget:
+        lines.pop(0)
+    return truncate_tokens("\n".join(lines), budget)
+
+
+class LLMSummarizer:
+    """Fold turns into the summary with the chat model, falling back to extractive_summary"""
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    def __call__(self, summary: str, turns: List[Turn], budget: int) -> str:
+        prompt = SUMMARY_PROMPT.format(
+            words=budget * 3 // 4,
+            summary=summary or "(empty)",
+            turns="\n".join(f"User: {turn.user}\nAssistant: {turn.assistant}" for turn in turns),
+        )
+        try:
+            return truncate_tokens(str(self.llm.invoke(prompt).content).strip(), budget)
+        except Exception:
+            logger.warning("Conversation summary failed; using extractive summary", exc_info=True)
+            return extractive_summary(summary, turns, budget)
+
+
+class ConversationMemory:
+    """Sliding window of recent turns plus a summary of older ones.
+
+    The history sent to the model never exceeds `token_cap`: the summary
+    gets at most a third of it, and the oldest turns leave the window (and
+    are folded into the summary) once the window is over `window_turns`
+    turns or the rest of the cap. Evicted turns are summarized in batches
+    of at least half the window, so a summarizing LLM call happens every few
+    turns rather than on each one. Single messages are clipped so one long
+    answer cannot take the whole cap.
+    """
+
+    def __init__(self, token_cap: int = 1000, window_turns: int = 6):
+        self.token_cap = token_cap
+        self.window_turns = window_turns
+        self.summary_budget = token_cap // 3
+        self.message_budget = max((token_cap - self.summary_budget) // 4, 1)
+        self.summary = ""
+        self.turns: Deque[Turn] = deque()
+        self._window_tokens = 0
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def clear(self) -> None:
+        self.summary = ""
+        self.turns.clear()
+        self._window_tokens = 0
+
+    def add_turn(self, user: str, assistant: str, summarize: Summarizer = extractive_summary) -> None:
+        turn = Turn(truncate_tokens(user, self.message_budget), truncate_tokens(assistant, self.message_budget))
+        self.turns.append(turn)
+        self._window_tokens += self._tokens(turn)
+        if len(self.turns) <= self.window_turns and self._window_tokens + estimate_tokens(self.summary) <= self.token_cap:
+            return
+
+        evicted = []
+        while self.turns and (len(evicted) < max(self.window_turns // 2, 1)
+                              or len(self.turns) > self.window_turns
+                              or self._window_tokens > self.token_cap - self.summary_budget):
+            oldest = self.turns.popleft()
+            self._window_tokens -= self._tokens(oldest)
+            evicted.append(oldest)
+        self.summary = summarize(self.summary, evicted, self.summary_budget)
+
+    def messages(self) -> List[Tuple[str, str]]:
+        """History as chat prompt messages: the summary, then the recent turns"""
+        messages = []
+        if self.summary:
+            messages.append(("system", f"Summary of the earlier conversation:\n{self.summary}"))
+        for turn in self.turns:
+            messages.append(("human", turn.user))
+            messages.append(("ai", turn.assistant))
+        return messages
+
+    @staticmethod
+    def _tokens(turn: Turn) -> int:
+        return estimate_tokens(turn.user) + estimate_tokens(turn.assistant)
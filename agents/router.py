@@ -0,0 +1,97 @@
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import List, Optional
+
+from langchain_core.documents import Document
+from agents.intents import Intent, IntentMatcher
+from utils.hybrid_retriever import BM25Index, HybridRetriever
+from utils.telemetry import get_telemetry
+
+logger = logging.getLogger(__name__)
+
+
+class Route(Enum):
+    BOOKING = "booking"
+    COLLECTING = "collecting"
+    SMALLTALK = "smalltalk"
+    DOCUMENT = "document"
+    AGENT = "agent"
+
+
+@dataclass
+class RouteDecision:
+    route: Route
+    reason: str
+    score: Optional[float] = None
+    documents: List[Document] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+class QueryRouter:
+    """Decide once, before any LLM call, which path answers a query.
+
+    Booking requests, small talk and the info-collection flow are recognized
+    locally by the intent matcher. Everything else is routed by hybrid
+    retrieval: queries the documents cover, by vector relevance or by
+    matching their rare terms (names, codes), go to the document QA chain
+    with the retrieved chunks; the rest go to the tool-calling agent.
+    With `bookings` off, booking requests are routed like any other query.
+    """
+
+    # Requests the agent's validation tool handles better than the documents
+    AGENT_PATTERN = re.compile(r"\b(validate|verify|check)\b.*\b(email|phone|number|date)\b", re.IGNORECASE)
+
+    def __init__(self, relevance_threshold: float = 0.4, lexical_threshold: float = 0.6,
+                 retriever: Optional[HybridRetriever] = None, bookings: bool = True):
+        self.relevance_threshold = relevance_threshold
+        self.lexical_threshold = lexical_threshold
+        self.retriever = retriever or HybridRetriever()
+        self.bookings = bookings
+        self.intent_matcher = IntentMatcher()
+
+    def route(self, query: str, collecting_info: bool, vectorstore=None,
+              lexical_index: Optional[BM25Index] = None) -> RouteDecision:
+        started = time.perf_counter()
+        decision = self._decide(query, collecting_info, vectorstore, lexical_index)
+        decision.elapsed = time.perf_counter() - started
+        telemetry = get_telemetry()
+        telemetry.observe("routing", decision.elapsed)
+        telemetry.count("routes_total", route=decision.route.value)
+        logger.info(
+            "Routed query to %s (%s, score=%s) in %.1f ms",
+            decision.route.value, decision.reason,
+            f"{decision.score:.3f}" if decision.score is not None else "n/a",
+            decision.elapsed * 1000
+        )
+        return decision
+
+    def _decide(self, query: str, collecting_info: bool, vectorstore, lexical_index) -> RouteDecision:
+        if collecting_info:
+            return RouteDecision(Route.COLLECTING, "collecting booking info")
+        intent = self.intent_matcher.classify(query)
+        if intent == Intent.BOOKING and self.bookings:
+            return RouteDecision(Route.BOOKING, "booking intent")
+        if intent == Intent.SMALLTALK:
+            return RouteDecision(Route.SMALLTALK, "small talk")
+        if vectorstore is None:
+            return RouteDecision(Route.AGENT, "no documents")
+        if self.AGENT_PATTERN.search(query):
+            return RouteDecision(Route.AGENT, "validation request")
+
+        try:
+            with get_telemetry().span("retrieval"):
+                result = self.retriever.search(query, vectorstore, lexical_index)
+        except Exception as e:
+            return RouteDecision(Route.AGENT, f"retrieval failed: {e}")
+        if not result.documents:
+            return RouteDecision(Route.AGENT, "no matching chunks")
+
+        score = result.vector_score
+        if score is not None and score >= self.relevance_threshold:
+            return RouteDecision(Route.DOCUMENT, "relevant chunks", score, result.documents)
+        if result.lexical_score >= self.lexical_threshold:
+            return RouteDecision(Route.DOCUMENT, "exact term match", score, result.documents)
+        return RouteDecision(Route.AGENT, "low retrieval score", score)
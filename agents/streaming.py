@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List, Optional
+
+from utils.telemetry import get_telemetry
+
+logger = logging.getLogger(__name__)
+
+_ITEM, _ERROR, _DONE = range(3)
+
+
+def iter_async(make_iterator: Callable[[], AsyncIterator[Any]]) -> Iterator[Any]:
+    """Consume an async iterator from synchronous code.
+
+    The async iterator runs on its own event loop in a background thread and
+    items are handed over through a queue as they are produced. Closing the
+    returned generator early stops the background iteration.
+    """
+    items: "queue.Queue" = queue.Queue()
+    stop = threading.Event()
+
+    async def consume():
+        try:
+            async for item in make_iterator():
+                items.put((_ITEM, item))
+                if stop.is_set():
+                    break
+        except BaseException as e:
+            items.put((_ERROR, e))
+            return
+        items.put((_DONE, None))
+
+    threading.Thread(target=asyncio.run, args=(consume(),), daemon=True).start()
+    try:
+        while True:
+            kind, value = items.get()
+            if kind == _DONE:
+                return
+            if kind == _ERROR:
+                raise value
+            yield value
+    finally:
+        stop.set()
+
+
+async def astream_text(runnable, inputs: dict, tools_used: Optional[List[str]] = None) -> AsyncIterator[str]:
+    """Yield the text tokens produced by chat models while a chain runs.
+
+    Names of tools the chain invokes are appended to `tools_used`.
+    """
+    async for event in runnable.astream_events(inputs, version="v2"):
+        if event["event"] == "on_chat_model_stream":
+            content = event["data"]["chunk"].content
+            # Tool-call chunks carry no text (or a list of parts)
+            if isinstance(content, str) and content:
+                yield content
+        elif event["event"] == "on_tool_start" and tools_used is not None:
+            tools_used.append(event["name"])
+
+
+class ResponseStream:
+    """Iterable of response text pieces, as rendered by st.write_stream.
+
+    Once consumed, `text` holds the full response and the timings are set.
+    """
+
+    def __init__(self, pieces: Iterable[str]):
+        self._pieces = pieces
+        self.text = ""
+        self.time_to_first_token: Optional[float] = None
+        self.total_time: Optional[float] = None
+        self._started = time.perf_counter()
+
+    def __iter__(self) -> Iterator[str]:
+        parts = []
+        for piece in self._pieces:
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - self._started
+            parts.append(piece)
+            yield piece
+        self.text = "".join(parts)
+        self.total_time = time.perf_counter() - self._started
+        telemetry = get_telemetry()
+        telemetry.observe("chat.first_token", self.time_to_first_token or self.total_time)
+        telemetry.observe("chat.stream", self.total_time)
+        logger.info(
+            "Streamed response: time to first token %.3fs, total %.3fs",
+            self.time_to_first_token or self.total_time, self.total_time
+        )
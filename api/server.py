@@ -0,0 +1,125 @@
+import io
+from typing import List, Optional
+
+from fastapi import Depends, FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from api.sessions import ChatSession, SessionStore, create_session_store
+from tools.booking import validate_booking
+from utils.outbox import get_booking_outbox
+from utils.telemetry import get_telemetry
+from utils.validators import Validators
+
+
+class ChatRequest(BaseModel):
+    message: str
+    stream: bool = False
+
+
+class ChatReply(BaseModel):
+    response: str
+    conversation_state: str
+
+
+class BookingRequest(BaseModel):
+    name: str
+    phone: str
+    email: str
+    appointment_date: str
+
+
+class NamedUpload(io.BytesIO):
+    """Uploaded file in the shape DocumentProcessor expects (like Streamlit's)"""
+
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+
+
+def create_app(store: Optional[SessionStore] = None) -> FastAPI:
+    """Build the HTTP API around ChatbotAgent"""
+    app = FastAPI(title="AI Chatbot Assistant API")
+    app.state.sessions = store if store is not None else create_session_store()
+
+    def get_session(session_id: str, request: Request) -> ChatSession:
+        session = request.app.state.sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired session")
+        return session
+
+    @app.get("/health")
+    def health(request: Request):
+        return {"status": "ok", "sessions": len(request.app.state.sessions)}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics():
+        """Prometheus scrape endpoint"""
+        return PlainTextResponse(get_telemetry().render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    @app.post("/sessions", status_code=201)
+    def create_session(request: Request):
+        return {"session_id": request.app.state.sessions.create().session_id}
+
+    @app.delete("/sessions/{session_id}", status_code=204)
+    def delete_session(session_id: str, request: Request):
+        if not request.app.state.sessions.delete(session_id):
+            raise HTTPException(status_code=404, detail="Unknown or expired session")
+
+    @app.put("/sessions/{session_id}/documents")
+    async def upload_documents(files: List[UploadFile] = File(default=[]),
+                               session: ChatSession = Depends(get_session)):
+        """Replace the session's documents; unchanged files are not re-indexed"""
+        uploads = [NamedUpload(file.filename or "upload.txt", await file.read()) for file in files]
+        async with session.lock:
+            indexed = await run_in_threadpool(session.chatbot.load_documents, uploads)
+            session.document_names = [upload.name for upload in uploads]
+        return {"documents": session.document_names, "indexed": indexed}
+
+    @app.post("/sessions/{session_id}/chat", response_model=ChatReply)
+    async def chat(body: ChatRequest, session: ChatSession = Depends(get_session)):
+        if body.stream:
+            return StreamingResponse(_stream_turn(session, body.message), media_type="text/plain; charset=utf-8")
+
+        async with session.lock:
+            response = await run_in_threadpool(session.chatbot.get_response, body.message)
+        return ChatReply(response=response, conversation_state=session.chatbot.session.conversation_state.value)
+
+    @app.post("/bookings", status_code=201)
+    async def create_booking(body: BookingRequest):
+        if not body.name.strip():
+            raise HTTPException(status_code=422, detail="Missing name")
+        error = validate_booking(body.phone, body.email)
+        if error:
+            raise HTTPException(status_code=422, detail=error)
+        appointment_date = Validators.parse_date_from_text(body.appointment_date)
+        if appointment_date is None:
+            raise HTTPException(status_code=422, detail="Could not understand the appointment date")
+
+        booking_id = await run_in_threadpool(
+            get_booking_outbox().enqueue, body.name.strip(), body.phone, body.email, appointment_date
+        )
+        return {"booking_id": booking_id, "appointment_date": appointment_date}
+
+    @app.get("/bookings/{booking_id}")
+    async def booking_status(booking_id: str):
+        booking = await run_in_threadpool(get_booking_outbox().status, booking_id)
+        if booking is None:
+            raise HTTPException(status_code=404, detail="Unknown booking")
+        return {key: booking[key] for key in
+                ("id", "name", "appointment_date", "status", "sheet_done", "email_done", "attempts", "last_error")}
+
+    return app
+
+
+async def _stream_turn(session: ChatSession, message: str):
+    # Hold the session lock until the answer is complete so the next turn
+    # sees the updated conversation state
+    async with session.lock:
+        stream = await run_in_threadpool(session.chatbot.stream_response, message)
+        async for piece in iterate_in_threadpool(iter(stream)):
+            yield piece
+
+
+app = create_app()
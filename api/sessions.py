@@ -0,0 +1,98 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from agents.chatbot_agent import ChatbotAgent
+
+
+@dataclass
+class ChatSession:
+    """Conversation state of one API client, the counterpart of st.session_state"""
+    session_id: str
+    chatbot: ChatbotAgent
+    document_names: list = field(default_factory=list)
+    last_used: float = field(default_factory=time.monotonic)
+    # Turns of one session run one at a time; they share its booking progress
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class SessionStore(ABC):
+    """Where the API keeps its sessions"""
+
+    @abstractmethod
+    def create(self) -> ChatSession:
+        ...
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        ...
+
+    def __len__(self) -> int:
+        return 0
+
+
+class InMemorySessionStore(SessionStore):
+    """Sessions held in this process, expired after `ttl` idle seconds.
+
+    At most `max_sessions` are kept; the least recently used session is
+    dropped first. Sessions are not shared between worker processes, so run
+    several workers behind a load balancer with sticky sessions.
+    """
+
+    def __init__(self, ttl: float = 3600, max_sessions: int = 1000,
+                 chatbot_factory: Callable[[], ChatbotAgent] = ChatbotAgent):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.chatbot_factory = chatbot_factory
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self) -> ChatSession:
+        session = ChatSession(uuid.uuid4().hex, self.chatbot_factory())
+        with self._lock:
+            self._expire()
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _expire(self) -> None:
+        deadline = time.monotonic() - self.ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_used > deadline:
+                break
+            del self._sessions[session_id]
+
+
+def create_session_store() -> SessionStore:
+    return InMemorySessionStore(
+        ttl=float(os.getenv("SESSION_TTL", 3600)),
+        max_sessions=int(os.getenv("SESSION_MAX", 1000)),
+    )
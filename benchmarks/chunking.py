@@ -0,0 +1,119 @@
+"""Compare the legacy size-only splitter with structure-aware chunking.
+
+Builds synthetic DOCX and TXT documents made of headed sections of varied
+length, then ingests each with both chunkers into a FAISS index over fake
+embeddings. Reports chunk count, duplicated (overlap) text, index size and
+ingestion time, plus re-ingestion with a warm chunk manifest. Run from the
+repository root:
+
+    python -m benchmarks.chunking
+"""
+import argparse
+import io
+import os
+import pickle
+import random
+import tempfile
+import time
+
+import docx
+import faiss
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+
+from utils.chunking import ChunkManifestStore
+from utils.document_processor import DocumentProcessor
+from benchmarks.fakes import FakeEmbeddings
+
+TOPICS = ["refund", "shipping", "warranty", "membership", "privacy", "support", "billing", "returns"]
+THINGS = ["grace", "notice", "coverage", "trial", "processing", "review", "exchange"]
+
+
+class Upload(io.BytesIO):
+    """In-memory uploaded file, shaped like Streamlit's"""
+
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+
+
+def make_sections(index: int, sections: int):
+    """(heading, paragraphs) pairs; most sections are short, a few are long"""
+    rng = random.Random(index)
+    result = []
+    for s in range(sections):
+        topic, thing = rng.choice(TOPICS), rng.choice(THINGS)
+        paragraphs = [
+            f"Under the {topic} policy customers get {rng.randint(2, 90)} days of {thing}. "
+            f"Requests about {topic} {thing} are handled by the {topic} team."
+            for _ in range(rng.choice([1, 1, 2, 2, 3, 12]))
+        ]
+        result.append((f"{s + 1}. {topic.title()} {thing}", paragraphs))
+    return result
+
+
+def make_docx(index: int, sections: int) -> Upload:
+    document = docx.Document()
+    document.add_heading(f"Policy handbook {index}", level=0)
+    for heading, paragraphs in make_sections(index, sections):
+        document.add_heading(heading, level=1)
+        for paragraph in paragraphs:
+            document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return Upload(f"handbook-{index}.docx", buffer.getvalue())
+
+
+def make_txt(index: int, sections: int) -> Upload:
+    lines = [f"# Policy handbook {index}", ""]
+    for heading, paragraphs in make_sections(index, sections):
+        lines += [f"## {heading}", ""] + [paragraph + "\n" for paragraph in paragraphs]
+    return Upload(f"handbook-{index}.txt", "\n".join(lines).encode("utf-8"))
+
+
+def legacy_split(processor: DocumentProcessor, upload: Upload):
+    """The former size-only splitter over the whole extracted text"""
+    upload.seek(0)
+    reader = processor.iter_docx_paragraphs if upload.name.endswith(".docx") else processor.iter_txt
+    splitter = RecursiveCharacterTextSplitter(chunk_size=processor.chunk_size, chunk_overlap=processor.chunk_overlap)
+    return splitter.split_text("".join(reader(upload)))
+
+
+def index_size(vectorstore: FAISS) -> int:
+    """Bytes of the serialized FAISS index plus the pickled docstore"""
+    return (len(faiss.serialize_index(vectorstore.index))
+            + len(pickle.dumps((vectorstore.docstore, vectorstore.index_to_docstore_id))))
+
+
+def ingest(label, split, uploads, embeddings):
+    started = time.perf_counter()
+    texts = [text for upload in uploads for text in split(upload)]
+    vectorstore = FAISS.from_texts(texts, embeddings)
+    elapsed = time.perf_counter() - started
+    characters = sum(len(text) for text in texts)
+    print(f"{label:<26} {len(texts):7d} {characters / 1000:9.1f}k {index_size(vectorstore) / 1024:9.1f}k "
+          f"{elapsed * 1000:9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=10, help="documents of each format")
+    parser.add_argument("--sections", type=int, default=60, help="headed sections per document")
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="seconds per embedding request")
+    args = parser.parse_args()
+
+    embeddings = FakeEmbeddings(latency=args.embed_latency)
+    with tempfile.TemporaryDirectory(prefix="chatbot-chunks-") as workdir:
+        processor = DocumentProcessor(embeddings=embeddings, embedding_model="fake-embeddings",
+                                      manifest_store=ChunkManifestStore(os.path.join(workdir, "chunks")))
+        for kind, make in (("docx", make_docx), ("txt", make_txt)):
+            uploads = [make(i, args.sections) for i in range(args.documents)]
+            print(f"\n{args.documents} {kind} documents")
+            print(f"{'chunker':<26} {'chunks':>7} {'chars':>10} {'index':>10} {'ms':>9}")
+            ingest("legacy splitter", lambda upload: legacy_split(processor, upload), uploads, embeddings)
+            ingest("structured (cold)", processor.split_file, uploads, embeddings)
+            ingest("structured (manifest)", processor.split_file, uploads, embeddings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark confirmation emails: a fresh SMTP connection per message
+versus the pooled sender, against a fake SMTP server with round-trip latency.
+
+Run from the repository root:
+
+    python -m benchmarks.emailer
+"""
+import time
+
+from utils.emailer import SMTPPool, build_confirmation_email
+from benchmarks.fakes import FakeSMTP
+
+ROUND_TRIP = 0.02
+
+
+def messages(count):
+    return [
+        build_confirmation_email(f"user{i}@example.com", f"User {i}", "2024-12-25",
+                                 booking_id=f"B{i:05d}", sender="bot@example.com", host="smtp.example.com")
+        for i in range(count)
+    ]
+
+
+def report(label, count, elapsed):
+    print(f"{label:<24} {count / elapsed:8.1f} msg/s  {elapsed * 1000 / count:7.1f} ms/msg")
+
+
+def main(count: int = 50):
+    outbox = []
+    started = time.perf_counter()
+    for msg in messages(count):
+        with FakeSMTP(outbox=outbox, latency=ROUND_TRIP) as server:
+            server.starttls()
+            server.login("bot@example.com", "secret")
+            server.send_message(msg)
+    report("connection per message", count, time.perf_counter() - started)
+
+    pooled = []
+    pool = SMTPPool("smtp.example.com", 587, "bot@example.com", "secret",
+                    connection_factory=lambda host, port, timeout: FakeSMTP(outbox=pooled, latency=ROUND_TRIP))
+    started = time.perf_counter()
+    for msg in messages(count // 2):
+        pool.send(msg)
+    assert not any(pool.send_many(messages(count - count // 2)))
+    report("pooled send/send_many", count, time.perf_counter() - started)
+
+    assert len(outbox) == len(pooled) == count
+    print(pool.stats())
+
+
+if __name__ == "__main__":
+    main()
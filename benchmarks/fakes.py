@@ -0,0 +1,258 @@
+"""Local stand-ins for external services, used by benchmarks, tests and
+`cli.batch --dry-run`; application modules never import them.
+
+Each fake has a configurable latency and error rate so slow or flaky
+backends can be simulated without network access.
+"""
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, Iterator, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from utils.emailer import SMTPPool, build_confirmation_email
+from utils.outbox import BookingOutbox
+from utils.sheets import SheetsWriter
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class FakeServiceError(Exception):
+    """Error injected by a fake backend"""
+
+
+class _FakeBackend:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call(self, name: str) -> None:
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.error_rate
+            self.failures += failed
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise FakeServiceError(f"Injected failure in {name}")
+
+
+class FakeWorksheet(_FakeBackend):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.rows: List[list] = []
+
+    def append_row(self, values, **kwargs):
+        self._call("append_row")
+        with self._lock:
+            self.rows.append(list(values))
+
+    def append_rows(self, values, **kwargs):
+        self._call("append_rows")
+        with self._lock:
+            self.rows.extend(list(row) for row in values)
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheet: FakeWorksheet):
+        self.sheet1 = worksheet
+
+
+class FakeGspreadClient(_FakeBackend):
+    """Stand-in for an authorized gspread client.
+
+    `latency` applies to opening the spreadsheet, and to writes on the
+    worksheet created when none is passed; a passed worksheet keeps its own
+    latency. All clients created from one worksheet share its rows.
+    """
+
+    def __init__(self, worksheet: FakeWorksheet = None, **kwargs):
+        super().__init__(**kwargs)
+        self.worksheet = worksheet or FakeWorksheet(latency=self.latency)
+
+    def open(self, title):
+        self._call("open")
+        return FakeSpreadsheet(self.worksheet)
+
+
+class FakeSMTP(_FakeBackend):
+    """Stand-in for smtplib.SMTP with simulated round-trip latency.
+
+    Connecting, STARTTLS and login each cost one round trip, as does every
+    command. Sent messages are collected in the shared `outbox` list.
+    """
+
+    def __init__(self, host=None, port=None, timeout=None, outbox: List = None, **kwargs):
+        super().__init__(**kwargs)
+        self.outbox = outbox if outbox is not None else []
+        self.closed = False
+        self._call("connect")
+
+    def starttls(self, *args, **kwargs):
+        self._call("starttls")
+        return (220, b"Ready to start TLS")
+
+    def login(self, user, password):
+        self._call("login")
+        return (235, b"Authentication successful")
+
+    def noop(self):
+        self._call("noop")
+        return (250, b"OK")
+
+    def send_message(self, msg, *args, **kwargs):
+        self._call("send_message")
+        with self._lock:
+            self.outbox.append(msg)
+        return {}
+
+    def quit(self):
+        self.closed = True
+        return (221, b"Bye")
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.quit()
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic stand-in for ChatGoogleGenerativeAI.
+
+    Replies with `reply_tokens` words drawn from the prompt, seeded by the
+    prompt text, so the same prompt always gets the same answer. `latency`
+    is the time to first token and `token_latency` the time per further
+    token. Tool binding is accepted but tools are never called.
+    """
+
+    latency: float = 0.0
+    token_latency: float = 0.0
+    error_rate: float = 0.0
+    reply_tokens: int = 40
+    seed: int = 0
+    _backend: _FakeBackend = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._backend = _FakeBackend(self.latency, self.error_rate, self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def calls(self) -> int:
+        return self._backend.calls
+
+    @property
+    def failures(self) -> int:
+        return self._backend.failures
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> Tuple[List[str], int]:
+        """Reply words and the prompt's size in words (its "input tokens")"""
+        prompt = "\n".join(str(message.content) for message in messages)
+        words = WORD_PATTERN.findall(prompt) or ["ok"]
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+        return [rng.choice(words) for _ in range(self.reply_tokens)], len(words)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self._backend._call("generate")
+        reply, input_tokens = self._reply(messages)
+        for i, word in enumerate(reply):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            usage = None
+            if i == len(reply) - 1:
+                usage = {"input_tokens": input_tokens, "output_tokens": len(reply),
+                         "total_tokens": input_tokens + len(reply)}
+            chunk = ChatGenerationChunk(message=AIMessageChunk(
+                content=word if i == 0 else " " + word, usage_metadata=usage))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        message = None
+        for chunk in self._stream(messages, stop, **kwargs):
+            message = chunk.message if message is None else message + chunk.message
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(
+            content=message.content, usage_metadata=message.usage_metadata))])
+
+
+class FakeEmbeddings(Embeddings, _FakeBackend):
+    """Deterministic stand-in for GoogleGenerativeAIEmbeddings.
+
+    Vectors are hashed bags of words, so texts sharing words score as
+    similar. Like real embeddings, unrelated texts still have a cosine
+    similarity of about `baseline`. `latency` applies to every embedding
+    request.
+    """
+
+    def __init__(self, dimensions: int = 256, baseline: float = 0.6, **kwargs):
+        super().__init__(**kwargs)
+        self.dimensions = dimensions
+        self.baseline = baseline
+        self.texts = 0
+
+    def _vector(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in WORD_PATTERN.findall(text.lower()):
+            digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dimensions] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        scale = math.sqrt(1 - self.baseline) / norm
+        # A component shared by all texts sets the similarity floor
+        return [value * scale for value in vector] + [math.sqrt(self.baseline)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self._call("embed_documents")
+        with self._lock:
+            self.texts += len(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self._call("embed_query")
+        return self._vector(text)
+
+
+def fake_booking_outbox(path: str, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+    """Booking outbox writing to a fake sheet and sending through fake SMTP.
+
+    Returns (outbox, worksheet, sent_messages).
+    """
+    worksheet = FakeWorksheet(latency=latency, error_rate=error_rate, seed=seed)
+    writer = SheetsWriter("Bookings", client_factory=lambda: FakeGspreadClient(worksheet, latency=latency))
+    sent: List = []
+    pool = SMTPPool("smtp.example.com", 587, "bot@example.com", "secret",
+                    connection_factory=lambda host, port, timeout: FakeSMTP(
+                        outbox=sent, latency=latency, error_rate=error_rate, seed=seed))
+
+    def send_emails(bookings):
+        return pool.send_many([
+            build_confirmation_email(to_email, name, appointment_date, booking_id, pool.sender, pool.host)
+            for to_email, name, appointment_date, booking_id in bookings
+        ])
+
+    outbox = BookingOutbox(path, append_rows=writer.append_rows, send_emails=send_emails,
+                           backoff=0.05, poll_interval=0.05)
+    return outbox, worksheet, sent
@@ -0,0 +1,97 @@
+"""Import-time report and cold-start regression check.
+
+Imports each entry module in a fresh interpreter with `-X importtime`, then
+prints the total and the slowest top-level packages. Exits non-zero if a
+module that should load lazily (Sheets, PDF/DOCX readers, FAISS, LangChain
+agents, the Gemini client) is imported at startup, or if the total exceeds
+--budget-ms. Run from the repository root:
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 2000
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+ENTRY_MODULES = ("ui.streamlit_app", "api.server")
+
+# Loaded on first use: at booking, for a PDF/DOCX upload, for a large
+# corpus, or when the first session needs the LLM
+DEFERRED_MODULES = (
+    "gspread",
+    "oauth2client",
+    "PyPDF2",
+    "docx",
+    "faiss",
+    "langchain.agents",
+    "langchain.chains",
+    "langchain_google_genai",
+)
+
+
+def profile(module: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every import done by `import module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.getcwd(),
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def report(module: str, rows: List[Tuple[str, int, int]], top: int) -> List[str]:
+    """Print the report for one module and return the deferred modules it imported"""
+    total = next((cumulative for name, _, cumulative in rows if name == module), 0)
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    print(f"\nimport {module}: {total / 1000:.0f} ms, {len(rows)} modules")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {package:<32} {self_us / 1000:8.1f} ms")
+
+    imported = {name for name, _, _ in rows}
+    return [deferred for deferred in DEFERRED_MODULES if deferred in imported]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=list(ENTRY_MODULES))
+    parser.add_argument("--top", type=int, default=12, help="packages to list")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per module; the fastest is reported")
+    parser.add_argument("--budget-ms", type=float, help="fail if a module takes longer to import")
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        runs = [profile(module) for _ in range(args.repeat)]
+        rows = min(runs, key=lambda rows: next((c for name, _, c in rows if name == module), 0))
+        eager = report(module, rows, args.top)
+        if eager:
+            failures.append(f"{module} imports {', '.join(eager)} at startup")
+        total_ms = next((cumulative for name, _, cumulative in rows if name == module), 0) / 1000
+        if args.budget_ms is not None and total_ms > args.budget_ms:
+            failures.append(f"{module} takes {total_ms:.0f} ms to import (budget {args.budget_ms:.0f} ms)")
+
+    if failures:
+        print("\nFAILED")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nOK: no deferred module is imported at startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark local intent classification and slot extraction.
+
+Run from the repository root:
+
+    python -m benchmarks.intents
+"""
+import time
+
+from agents.intents import Intent, IntentMatcher, SlotExtractor
+
+CORPUS = [
+    ("can someone ring me back?", Intent.BOOKING),
+    ("Call me please", Intent.BOOKING),
+    ("I'd like to book an appointment for next monday", Intent.BOOKING),
+    ("please schedule a call tomorrow", Intent.BOOKING),
+    ("could somebody contact me about pricing", Intent.BOOKING),
+    ("get in touch with me at ram@example.com", Intent.BOOKING),
+    ("hi", Intent.SMALLTALK),
+    ("Thank you so much!", Intent.SMALLTALK),
+    ("good morning", Intent.SMALLTALK),
+    ("what is the refund policy?", Intent.QA),
+    ("how do I call the API from python", Intent.QA),
+    ("How can customers contact us?", Intent.QA),
+    ("What is the procedure to schedule a meeting with HR?", Intent.QA),
+    ("Can I make a call from the app?", Intent.QA),
+    ("summarize chapter 3 of the handbook", Intent.QA),
+]
+
+SLOT_MESSAGES = [
+    "Hi, I'm Ram Sharma, call me on 9841234567 tomorrow",
+    "ram@example.com and +977 9812345678, next friday",
+    "my name is Sita, sita@example.org, 26th may",
+    "This is John Smith",
+]
+
+
+def bench(label, func, inputs, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in inputs:
+            func(text)
+    per_call = (time.perf_counter() - started) / (rounds * len(inputs))
+    print(f"{label:<24} {per_call * 1e6:8.1f} µs/call")
+    return per_call
+
+
+def main(rounds: int = 2000):
+    matcher = IntentMatcher()
+    extractor = SlotExtractor()
+
+    for text, expected in CORPUS:
+        assert matcher.classify(text) == expected, (text, matcher.classify(text), expected)
+
+    texts = [text for text, _ in CORPUS]
+    classify = bench("intent classification", matcher.classify, texts, rounds)
+    bench("slot extraction", extractor.extract, SLOT_MESSAGES, rounds // 4)
+    assert classify < 1e-3, "intent classification should stay sub-millisecond"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""End-to-end load test of the chatbot against local fakes.
+
+Every session uploads documents, then runs a scripted conversation: small
+talk, document questions, an agent question and a four-turn booking. The
+LLM, embeddings, Google Sheets and SMTP are deterministic fakes with
+configurable latency and error injection, so runs are repeatable and need
+no network. Reports p50/p95/p99 latency and throughput per stage.
+
+Run from the repository root:
+
+    python -m benchmarks.load --sessions 50 --concurrency 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Keep the benchmark's caches and outbox away from the app's
+_workdir = tempfile.TemporaryDirectory(prefix="chatbot-load-")
+os.environ.setdefault("EMBEDDING_CACHE_PATH", os.path.join(_workdir.name, "embeddings.sqlite3"))
+os.environ.setdefault("INDEX_STORE_DIR", os.path.join(_workdir.name, "indexes"))
+os.environ.setdefault("CHUNK_MANIFEST_DIR", os.path.join(_workdir.name, "chunks"))
+
+from agents.chatbot_agent import AgentResources, ChatbotAgent, SessionContext
+from config.settings import get_embedding_cache, get_index_store
+from utils.document_processor import DocumentProcessor
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings, fake_booking_outbox
+from utils.index_manager import IndexManager
+from utils.outbox import set_booking_outbox
+from utils.telemetry import get_telemetry
+
+TOPICS = ["refund", "shipping", "warranty", "membership", "privacy", "support", "billing", "returns"]
+THINGS = ["grace", "notice", "coverage", "trial", "processing", "review", "cooling-off", "exchange"]
+
+
+class Upload:
+    """In-memory uploaded file, shaped like Streamlit's"""
+
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self._data = data
+
+    def getvalue(self) -> bytes:
+        return self._data
+
+    def read(self) -> bytes:
+        return self._data
+
+    def seek(self, offset: int) -> None:
+        pass
+
+
+def make_document(index: int, paragraphs: int = 40):
+    """Synthetic policy document and questions it answers"""
+    rng = random.Random(index)
+    lines, questions = [], []
+    for p in range(paragraphs):
+        topic, thing = rng.choice(TOPICS), rng.choice(THINGS)
+        days = rng.randint(2, 90)
+        lines.append(f"Section {p + 1}. Under the {topic} policy customers get {days} days of {thing}. "
+                     f"Requests about {topic} {thing} are handled by the {topic} team within {days // 2 + 1} days.")
+        questions.append(f"How many days of {thing} does the {topic} policy give?")
+    return Upload(f"policy-{index}.txt", "\n\n".join(lines).encode("utf-8")), questions
+
+
+def conversation(session: int, questions):
+    return [
+        ("smalltalk", "hi"),
+        ("document", questions[0]),
+        ("document", questions[len(questions) // 2]),
+        ("agent", f"Can you validate the email user{session}@example.com for me?"),
+        ("booking", f"Please call me, my name is User {session}"),
+        ("booking", f"98{session % 10}{session:07d}"),
+        ("booking", f"user{session}@example.com"),
+        ("booking", "next monday"),
+    ]
+
+
+def percentile(sorted_values, q: float) -> float:
+    # Nearest-rank percentile
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.samples[stage].append(seconds)
+
+    def fail(self, stage: str) -> None:
+        self.errors[stage] += 1
+
+    def report(self, wall: float) -> None:
+        print(f"{'stage':<22} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'per s':>8}")
+        for stage in sorted(set(self.samples) | set(self.errors)):
+            values = sorted(self.samples[stage])
+            if values:
+                p50, p95, p99 = (percentile(values, q) * 1000 for q in (50, 95, 99))
+                cells = f"{p50:9.1f} {p95:9.1f} {p99:9.1f}"
+            else:
+                cells = f"{'-':>9} {'-':>9} {'-':>9}"
+            print(f"{stage:<22} {len(values):6d} {self.errors[stage]:6d} {cells} {len(values) / wall:8.1f}")
+
+
+def run_session(session: int, resources, embeddings, args, recorder: Recorder) -> None:
+    doc_index = session if args.unique_docs else session % args.documents
+    upload, questions = make_document(doc_index, args.paragraphs)
+    doc_processor = DocumentProcessor(embeddings=embeddings, embedding_model="fake-embeddings")
+    chatbot = ChatbotAgent(resources, SessionContext(doc_processor, IndexManager(doc_processor, get_index_store())))
+
+    started = time.perf_counter()
+    try:
+        if not chatbot.load_documents([upload]):
+            raise RuntimeError("indexing failed")
+        recorder.record("upload", time.perf_counter() - started)
+    except Exception:
+        recorder.fail("upload")
+
+    for stage, message in conversation(session, questions):
+        started = time.perf_counter()
+        try:
+            if args.stream:
+                stream = chatbot.stream_response(message)
+                for _ in stream:
+                    pass
+                recorder.record(f"first_token:{stage}", stream.time_to_first_token or 0.0)
+            else:
+                chatbot.get_response(message)
+            recorder.record(f"turn:{stage}", time.perf_counter() - started)
+        except Exception:
+            recorder.fail(f"turn:{stage}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--documents", type=int, default=4, help="distinct documents shared by the sessions")
+    parser.add_argument("--unique-docs", action="store_true", help="give every session its own document")
+    parser.add_argument("--paragraphs", type=int, default=40)
+    parser.add_argument("--stream", action="store_true", help="use stream_response and report time to first token")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds to first token")
+    parser.add_argument("--token-latency", type=float, default=0.005)
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="seconds per embedding request")
+    parser.add_argument("--service-latency", type=float, default=0.02, help="Sheets/SMTP round trip")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="injected failure rate of every fake")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    llm = FakeChatModel(latency=args.llm_latency, token_latency=args.token_latency,
+                        error_rate=args.error_rate, seed=args.seed)
+    embeddings = FakeEmbeddings(latency=args.embed_latency, error_rate=args.error_rate, seed=args.seed)
+    outbox, worksheet, sent = fake_booking_outbox(
+        os.path.join(_workdir.name, "outbox.sqlite3"), args.service_latency, args.error_rate, args.seed
+    )
+    set_booking_outbox(outbox)
+    resources = AgentResources.build(llm)
+    recorder = Recorder()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for future in [executor.submit(run_session, i, resources, embeddings, args, recorder)
+                       for i in range(args.sessions)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    # Background booking side effects
+    drain_started = time.perf_counter()
+    while outbox.stats().get("pending") and time.perf_counter() - drain_started < 60:
+        time.sleep(0.05)
+    drain = time.perf_counter() - drain_started
+    outbox.stop()
+
+    print(f"{args.sessions} sessions at concurrency {args.concurrency} in {wall:.2f}s\n")
+    recorder.report(wall)
+    # The app turns most backend errors into replies, so count them at the source
+    print(f"\nLLM calls: {llm.calls} ({llm.failures} failed)  "
+          f"embedding requests: {embeddings.calls} ({embeddings.failures} failed, {embeddings.texts} texts)")
+    print(f"response cache: {resources.response_cache.stats()}")
+    print(f"embedding cache: {get_embedding_cache().stats()}")
+    print("\nInstrumented stages (approximate, from telemetry histograms):")
+    for stage in get_telemetry().stage_summary():
+        print(f"  {stage['stage']:<20} {stage['count']:6d}  mean {stage['mean_ms']:8.1f} ms  "
+              f"p95 <= {stage['p95_ms']:8.1f} ms")
+    print(f"outbox: {outbox.stats()} drained {drain:.2f}s after the last turn; "
+          f"{len(worksheet.rows)} sheet rows, {len(sent)} emails")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        _workdir.cleanup()
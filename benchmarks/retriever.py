@@ -0,0 +1,132 @@
+"""Compare the NumPy vector store with FAISS across corpus sizes.
+
+For each backend and corpus size a fresh worker process builds the store
+from precomputed unit vectors (embedding cost excluded) and runs single
+queries through similarity_search_with_relevance_scores, as the router
+does. Reports build time, p50/p95 query latency, the RSS growth of the
+import and of the built store, and recall@4 against exact float32 search.
+Run from the repository root:
+
+    python -m benchmarks.retriever
+"""
+import argparse
+import importlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BACKENDS = ("faiss", "numpy-float32", "numpy-float16", "numpy-int8")
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current RSS, in KiB on Linux and bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def make_vectors(size: int, dimensions: int, queries: int, seed: int = 0):
+    """Clustered unit vectors, and queries near random stored vectors"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(size // 20, 1), dimensions), dtype=np.float32)
+    vectors = centers[rng.integers(0, len(centers), size)] + 0.5 * rng.standard_normal((size, dimensions), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    targets = vectors[rng.integers(0, size, queries)]
+    query_vectors = targets + 0.3 * rng.standard_normal(targets.shape, dtype=np.float32)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    return vectors, query_vectors
+
+
+def worker(backend: str, size: int, dimensions: int, queries: int) -> dict:
+    from langchain_core.embeddings import Embeddings
+
+    vectors, query_vectors = make_vectors(size, dimensions, queries)
+    texts = [f"chunk {i}" for i in range(size)]
+    query_texts = [f"query {i}" for i in range(queries)]
+    lookup = dict(zip(query_texts, query_vectors.tolist()))
+
+    class LookupEmbeddings(Embeddings):
+        """Precomputed query vectors, so only the store is measured"""
+
+        def embed_documents(self, texts):
+            raise NotImplementedError
+
+        def embed_query(self, text):
+            return lookup[text]
+
+    text_embeddings = list(zip(texts, vectors.tolist()))
+    ids = [f"doc:{i}" for i in range(size)]
+    baseline = rss_bytes()
+    if backend == "faiss":
+        from langchain_community.vectorstores import FAISS
+        # The wrapper imports faiss on first use; load it here so its memory
+        # counts towards import_mb and not towards building the index
+        importlib.import_module("faiss")
+        imported = rss_bytes()
+        started = time.perf_counter()
+        store = FAISS.from_embeddings(text_embeddings, LookupEmbeddings(), ids=ids)
+    else:
+        from utils.numpy_store import NumpyVectorStore
+        imported = rss_bytes()
+        started = time.perf_counter()
+        store = NumpyVectorStore.from_embeddings(text_embeddings, LookupEmbeddings(), ids=ids,
+                                                 dtype=backend.split("-")[1])
+    build = time.perf_counter() - started
+    built = rss_bytes()
+
+    latencies, found = [], []
+    for text in query_texts:
+        started = time.perf_counter()
+        hits = store.similarity_search_with_relevance_scores(text, k=4)
+        latencies.append(time.perf_counter() - started)
+        found.append({doc.id for doc, _ in hits})
+
+    # Exact float32 top-4 as ground truth
+    exact = np.argsort(-(query_vectors @ vectors.T), axis=1)[:, :4]
+    recall = np.mean([len(hits & {ids[i] for i in row}) / 4 for hits, row in zip(found, exact)])
+    return {
+        "build_ms": build * 1000,
+        "p50_us": float(np.percentile(latencies, 50)) * 1e6,
+        "p95_us": float(np.percentile(latencies, 95)) * 1e6,
+        "import_mb": (imported - baseline) / 2 ** 20,
+        "store_mb": (built - imported) / 2 ** 20,
+        "recall": float(recall),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300, 3000, 30000], help="chunks per corpus")
+    parser.add_argument("--dimensions", type=int, default=768, help="embedding dimensions")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        backend, size = args.worker
+        print(json.dumps(worker(backend, int(size), args.dimensions, args.queries)))
+        return
+
+    print(f"{'backend':<15} {'chunks':>7} {'build ms':>9} {'p50 us':>8} {'p95 us':>8} "
+          f"{'import MB':>10} {'store MB':>9} {'recall@4':>9}")
+    for size in args.sizes:
+        for backend in BACKENDS:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.retriever", "--worker", backend, str(size),
+                 "--dimensions", str(args.dimensions), "--queries", str(args.queries)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            r = json.loads(output.strip().splitlines()[-1])
+            print(f"{backend:<15} {size:7d} {r['build_ms']:9.1f} {r['p50_us']:8.0f} {r['p95_us']:8.0f} "
+                  f"{r['import_mb']:10.1f} {r['store_mb']:9.1f} {r['recall']:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Benchmark booking writes to Google Sheets against a fake gspread backend.
+
+Compares the per-booking authorize/open/append_row pattern with the shared
+SheetsWriter under concurrent bookings. Run from the repository root:
+
+    python -m benchmarks.sheets
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FakeGspreadClient, FakeWorksheet
+from utils.sheets import SheetsWriter
+
+AUTH_LATENCY = 0.05   # authorize + open
+WRITE_LATENCY = 0.03  # one append call
+
+
+def run(label, book, bookings, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(book, range(bookings)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {bookings / elapsed:8.1f} bookings/s  {elapsed * 1000 / bookings:7.1f} ms/booking")
+
+
+def main(bookings: int = 200, concurrency: int = 20):
+    worksheet = FakeWorksheet(latency=WRITE_LATENCY)
+
+    def naive(i):
+        client = FakeGspreadClient(worksheet, latency=AUTH_LATENCY)
+        client.open("Bookings").sheet1.append_row([f"user{i}", "9812345678", f"user{i}@example.com", "2024-12-25"])
+
+    run("per-booking client", naive, bookings, concurrency)
+    naive_calls = worksheet.calls
+
+    worksheet = FakeWorksheet(latency=WRITE_LATENCY)
+    writer = SheetsWriter(
+        sheet_name="Bookings",
+        client_factory=lambda: FakeGspreadClient(worksheet, latency=AUTH_LATENCY),
+        linger=0.01,
+    )
+    run("shared SheetsWriter", lambda i: writer.append_row(
+        [f"user{i}", "9812345678", f"user{i}@example.com", "2024-12-25"]), bookings, concurrency)
+
+    assert len(worksheet.rows) == bookings
+    print(f"append calls: {naive_calls} per-booking vs {writer.api_calls} coalesced")
+
+
+if __name__ == "__main__":
+    main()
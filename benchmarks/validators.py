@@ -0,0 +1,74 @@
+"""Benchmark date parsing and phone validation throughput.
+
+Every phrase is checked against its expected result (with a fixed "now")
+before timing, so the benchmark doubles as a correctness check. Run from
+the repository root:
+
+    python -m benchmarks.validators
+"""
+import itertools
+import time
+from datetime import date
+
+from utils.validators import Validators
+
+NOW = date(2024, 12, 18)  # a Wednesday
+
+DATE_CASES = {
+    "today": "2024-12-18",
+    "tomorrow please": "2024-12-19",
+    "day after tomorrow": "2024-12-20",
+    "in 3 days": "2024-12-21",
+    "in a week": "2024-12-25",
+    "2 weeks from now": "2025-01-01",
+    "next monday": "2024-12-23",
+    "next wednesday": "2024-12-25",
+    "this wednesday": "2024-12-18",
+    "friday": "2024-12-20",
+    "sunday afternoon": "2024-12-22",
+    "26th may": "2025-05-26",
+    "may 26": "2025-05-26",
+    "December 25th": "2024-12-25",
+    "on 5 jan": "2025-01-05",
+    "26 may 2026": "2026-05-26",
+    "2024-12-25": "2024-12-25",
+    "25/12/2024": "2024-12-25",
+    "2025-02-30": None,
+    "sometime soon": None,
+}
+
+PHONE_CASES = {
+    "+9779812345678": True,
+    "9812345678": True,
+    "09812345678": True,
+    "98-1234-5678": True,
+    "9912345678": False,
+    "12345": False,
+}
+
+
+def check():
+    for text, expected in DATE_CASES.items():
+        parsed = Validators.parse_date_from_text(text, now=NOW)
+        assert parsed == expected, (text, parsed, expected)
+    for phone, expected in PHONE_CASES.items():
+        assert Validators.validate_phone(phone) == expected, phone
+
+
+def bench(label, func, inputs, total):
+    corpus = list(itertools.islice(itertools.cycle(inputs), total))
+    started = time.perf_counter()
+    for item in corpus:
+        func(item)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<16} {total / elapsed:12,.0f} calls/s  {elapsed / total * 1e6:6.1f} µs/call")
+
+
+def main(total: int = 200_000):
+    check()
+    bench("parse_date", lambda text: Validators.parse_date_from_text(text, now=NOW), list(DATE_CASES), total)
+    bench("validate_phone", Validators.validate_phone, list(PHONE_CASES), total)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Offline batch runner: answer question lists and import bookings.
+
+Input is streamed from JSONL (one object, or a bare string, per line) or
+CSV with a header row; results are written as JSONL, one record per input
+item in input order, each with its latency. Run from the repository root:
+
+    python -m cli.batch ask questions.jsonl --documents handbook.pdf -o answers.jsonl
+    python -m cli.batch book callbacks.csv -o bookings.jsonl
+    python -m cli.batch ask questions.csv --documents handbook.pdf --dry-run
+
+`ask` answers every question against the given documents with bounded
+concurrency; repeated questions are answered once. It never books: a
+question phrased as a callback request is answered like any other. `book` validates each
+callback request and records it in the booking outbox in batches; the
+Sheets rows and confirmation emails are then written by the outbox's
+batching workers, and the run waits for them. `--dry-run` swaps Gemini,
+the embeddings, Google Sheets and SMTP for the local fakes in
+benchmarks/fakes.py and keeps all caches in a temporary directory.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+QUESTION_FIELDS = ("question", "query", "message", "text")
+
+
+class FileUpload(io.BytesIO):
+    """A document read from disk, shaped like Streamlit's uploaded file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[int, dict]]:
+    """Yield (line number, record) pairs from a JSONL or CSV file ("-" for stdin)"""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            for line, row in enumerate(csv.DictReader(stream), start=2):
+                yield line, {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+            return
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as e:
+                yield line, {"error": f"Invalid JSON: {e}"}
+                continue
+            yield line, record if isinstance(record, dict) else {"question": str(record)}
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def normalize(text: str) -> str:
+    return WHITESPACE_PATTERN.sub(" ", text).strip().lower()
+
+
+def write_record(out: IO[str], record: dict) -> None:
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+def print_summary(label: str, latencies: List[float], counts: Dict[str, int], wall: float) -> None:
+    values = sorted(latencies)
+    quantile = lambda q: values[min(int(q * len(values)), len(values) - 1)] * 1000 if values else 0.0
+    counts_text = ", ".join(f"{count} {name}" for name, count in counts.items() if count)
+    print(f"{label}: {counts_text or 'nothing to do'} in {wall:.2f}s; "
+          f"latency p50 {quantile(0.5):.0f} ms, p95 {quantile(0.95):.0f} ms", file=sys.stderr)
+
+
+def use_fakes(workdir: str) -> None:
+    """Point every cache and store at `workdir`; must run before the app modules are imported"""
+    os.environ["EMBEDDING_CACHE_PATH"] = os.path.join(workdir, "embeddings.sqlite3")
+    os.environ["INDEX_STORE_DIR"] = os.path.join(workdir, "indexes")
+    os.environ["CHUNK_MANIFEST_DIR"] = os.path.join(workdir, "chunks")
+    os.environ["OUTBOX_PATH"] = os.path.join(workdir, "outbox.sqlite3")
+
+    from benchmarks.fakes import fake_booking_outbox
+    from utils.outbox import set_booking_outbox
+    outbox, _, _ = fake_booking_outbox(os.environ["OUTBOX_PATH"])
+    set_booking_outbox(outbox)
+
+
+def run_ask(args, out: IO[str]) -> int:
+    from agents.chatbot_agent import AgentResources, ChatbotAgent, SessionContext, UserInfo, _new_memory
+
+    if args.dry_run:
+        from utils.document_processor import DocumentProcessor
+        from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+        from utils.index_manager import IndexManager
+        resources = AgentResources.build(FakeChatModel(latency=0.0, token_latency=0.0), bookings=False)
+        doc_processor = DocumentProcessor(embeddings=FakeEmbeddings(), embedding_model="fake-embeddings")
+        session = SessionContext(doc_processor, IndexManager(doc_processor))
+    else:
+        # Without the booking flow and tool, no answer writes Sheets rows or sends emails
+        resources, session = AgentResources.build(bookings=False), SessionContext.create()
+
+    base = ChatbotAgent(resources, session)
+    if args.documents and not base.load_documents([FileUpload(path) for path in args.documents]):
+        print("Could not index the documents", file=sys.stderr)
+        return 1
+
+    def answer(question: str) -> dict:
+        # Questions are independent: a fresh conversation per question, sharing the document index
+        chatbot = ChatbotAgent(resources, replace(session, memory=_new_memory(), user_info=UserInfo()))
+        started = time.perf_counter()
+        try:
+            response = chatbot.get_response(question)
+            return {"answer": response, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+        except Exception as e:
+            return {"error": str(e), "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    started = time.perf_counter()
+    first_seen: Dict[str, Tuple[object, Future]] = {}
+    pending = deque()
+    latencies: List[float] = []
+    counts = {"answered": 0, "duplicates": 0, "errors": 0}
+
+    def emit(item_id, question, future: Future, duplicate_of=None) -> None:
+        result = future.result()
+        record = {"id": item_id, "question": question, **result}
+        if question is None:
+            del record["question"]
+            counts["errors"] += 1
+        elif duplicate_of is not None:
+            # Answered once for the first occurrence; no time spent here
+            record.update(duplicate_of=duplicate_of, latency_ms=0.0)
+            counts["duplicates"] += 1
+        else:
+            latencies.append(result["latency_ms"] / 1000)
+            counts["errors" if "error" in result else "answered"] += 1
+        write_record(out, record)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for line, record in read_records(args.input, args.format):
+            item_id = record.get("id", line)
+            question = next((str(record[field]) for field in QUESTION_FIELDS if record.get(field)), "")
+            key = normalize(question)
+            if not question:
+                # Nothing to answer, but written in turn with the answers around it
+                future = Future()
+                future.set_result({"error": record.get("error", "No question")})
+                pending.append((item_id, None, future, None))
+            elif key in first_seen:
+                first_id, future = first_seen[key]
+                pending.append((item_id, question, future, first_id))
+            else:
+                future = executor.submit(answer, question)
+                first_seen[key] = (item_id, future)
+                pending.append((item_id, question, future, None))
+
+            # Bounded in-flight window; results are written in input order
+            while len(pending) > 2 * args.concurrency:
+                emit(*pending.popleft())
+        while pending:
+            emit(*pending.popleft())
+
+    print_summary("ask", latencies, counts, time.perf_counter() - started)
+    return 0
+
+
+def run_book(args, out: IO[str]) -> int:
+    from tools.booking import validate_booking
+    from utils.outbox import get_booking_outbox
+    from utils.validators import Validators
+
+    outbox = get_booking_outbox()
+    started = time.perf_counter()
+    latencies: List[float] = []
+    counts = {"queued": 0, "already done": 0, "duplicates": 0, "invalid": 0}
+    seen = set()
+    queued_ids: List[str] = []
+    # (record, booking or None, read time) in input order; rows already
+    # decided (invalid, duplicate) wait with the batch to keep the order
+    batch: List[Tuple[dict, Optional[tuple], float]] = []
+
+    def flush() -> None:
+        bookings = [booking for _, booking, _ in batch if booking]
+        recorded = iter(outbox.enqueue_many(bookings) if bookings else [])
+        now = time.perf_counter()
+        for record, booking, read_at in batch:
+            if booking:
+                # Bookings processed by an earlier run stay done; failed ones are requeued
+                booking_id, status = next(recorded)
+                status = "queued" if status == "pending" else status
+                record.update(booking_id=booking_id, status=status, latency_ms=round((now - read_at) * 1000, 1))
+                latencies.append(now - read_at)
+                queued_ids.append(booking_id)
+                counts["already done" if status == "done" else "queued"] += 1
+            write_record(out, record)
+        batch.clear()
+
+    batched = 0
+    for line, row in read_records(args.input, args.format):
+        read_at = time.perf_counter()
+        name, phone, email = (str(row.get(field, "")).strip() for field in ("name", "phone", "email"))
+        date_text = str(row.get("appointment_date") or row.get("date") or "").strip()
+        record = {"id": row.get("id", line), "name": name, "email": email}
+
+        error = row.get("error") or (None if name else "Missing name") or validate_booking(phone, email)
+        appointment_date = Validators.parse_date_from_text(date_text) if not error else None
+        if not error and appointment_date is None:
+            error = f"Could not understand the appointment date {date_text!r}"
+        booking = None
+        if error:
+            counts["invalid"] += 1
+            record.update(status="invalid", error=error, latency_ms=0.0)
+        else:
+            booking = (name, phone, email, appointment_date)
+            booking_id = outbox.booking_id(*booking)
+            if booking_id in seen:
+                counts["duplicates"] += 1
+                record.update(booking_id=booking_id, status="duplicate", latency_ms=0.0)
+                booking = None
+            seen.add(booking_id)
+
+        batch.append((record, booking, read_at))
+        batched += booking is not None
+        if batched >= args.batch_size:
+            flush()
+            batched = 0
+    flush()
+    print_summary("book", latencies, counts, time.perf_counter() - started)
+
+    # Side effects run in the outbox workers; bookings still pending at the
+    # timeout stay queued in the durable outbox for the app to finish
+    deadline = time.monotonic() + args.timeout
+    remaining = list(queued_ids)
+    while remaining and time.monotonic() < deadline:
+        remaining = [booking_id for booking_id in remaining
+                     if (outbox.status(booking_id) or {}).get("status") == "pending"]
+        if remaining:
+            time.sleep(0.2)
+    statuses: Dict[str, int] = {}
+    for booking_id in queued_ids:
+        status = (outbox.status(booking_id) or {}).get("status", "unknown")
+        statuses[status] = statuses.get(status, 0) + 1
+    print(f"booking side effects after {time.perf_counter() - started:.2f}s: {statuses}", file=sys.stderr)
+    return 1 if statuses.get("failed") else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(command):
+        command.add_argument("input", help='JSONL or CSV file, or "-" for stdin')
+        command.add_argument("-o", "--output", default="-", help="JSONL results file (default: stdout)")
+        command.add_argument("--format", choices=("jsonl", "csv"), help="input format (default: by extension)")
+        command.add_argument("--dry-run", action="store_true", help="use local fakes instead of Gemini, Sheets and SMTP")
+
+    ask = commands.add_parser("ask", help="answer a list of questions against documents")
+    add_common(ask)
+    ask.add_argument("--documents", nargs="*", default=[], help="PDF, DOCX or TXT files to answer from")
+    ask.add_argument("--concurrency", type=int, default=4)
+
+    book = commands.add_parser("book", help="import callback requests as bookings")
+    add_common(book)
+    book.add_argument("--batch-size", type=int, default=100, help="bookings recorded per outbox transaction")
+    book.add_argument("--timeout", type=float, default=300, help="seconds to wait for Sheets rows and emails")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    workdir = None
+    if args.dry_run:
+        workdir = tempfile.TemporaryDirectory(prefix="chatbot-batch-")
+        use_fakes(workdir.name)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        # The agent executor prints its steps; keep them out of the results
+        with contextlib.redirect_stdout(sys.stderr):
+            return run_ask(args, out) if args.command == "ask" else run_book(args, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if workdir is not None:
+            from utils.outbox import get_booking_outbox
+            get_booking_outbox().stop()
+            workdir.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,53 @@
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from utils.chunking import ChunkManifestStore
+from utils.embedding_cache import EmbeddingCache
+from utils.index_store import IndexStore
+from utils.embedding_scheduler import TokenBucket
+from utils.hybrid_retriever import CrossEncoderReranker
+from utils.response_cache import SemanticResponseCache
+from utils.telemetry import get_telemetry
 
 # Load environment variables
 load_dotenv()
 
+EMBEDDING_MODEL = "models/embedding-001"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 100_000))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", 4))
+EMBEDDING_RATE_LIMIT = float(os.getenv("EMBEDDING_RATE_LIMIT", 5))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", 3))
+INDEX_STORE_DIR = os.getenv("INDEX_STORE_DIR", ".cache/indexes")
+CHUNK_MANIFEST_DIR = os.getenv("CHUNK_MANIFEST_DIR", ".cache/chunks")
+# Corpora up to this many chunks use the NumPy vector store instead of FAISS (0 disables it)
+NUMPY_STORE_MAX_VECTORS = int(os.getenv("NUMPY_STORE_MAX_VECTORS", 10000))
+NUMPY_STORE_DTYPE = os.getenv("NUMPY_STORE_DTYPE", "float32")
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", 0.95))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 3600))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1000))
+ROUTER_RELEVANCE_THRESHOLD = float(os.getenv("ROUTER_RELEVANCE_THRESHOLD", 0.4))
+ROUTER_LEXICAL_THRESHOLD = float(os.getenv("ROUTER_LEXICAL_THRESHOLD", 0.6))
+HYBRID_ALPHA = float(os.getenv("HYBRID_ALPHA", 0.7))
+RETRIEVAL_FETCH_K = int(os.getenv("RETRIEVAL_FETCH_K", 20))
+RETRIEVAL_MAX_K = int(os.getenv("RETRIEVAL_MAX_K", 4))
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "")
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 1500))
+MEMORY_TOKEN_CAP = int(os.getenv("MEMORY_TOKEN_CAP", 1000))
+MEMORY_WINDOW_TURNS = int(os.getenv("MEMORY_WINDOW_TURNS", 6))
+MEMORY_SUMMARIZER = os.getenv("MEMORY_SUMMARIZER", "extractive")
+CHAT_PAGE_SIZE = int(os.getenv("CHAT_PAGE_SIZE", 20))
+CHAT_HISTORY_MAX = int(os.getenv("CHAT_HISTORY_MAX", 200))
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", os.cpu_count() or 1))
+
 # Initialize the LLM model
 @st.cache_resource
 def get_llm_model():
+    # Imported on first use, as are the other heavy clients below
+    from langchain_google_genai import ChatGoogleGenerativeAI
     return ChatGoogleGenerativeAI(
         model="gemini-2.0-flash",
         temperature=0,
@@ -20,4 +59,50 @@ def get_llm_model():
 # Initialize embeddings
 @st.cache_resource
 def get_embeddings():
-    return GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    return GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL)
+
+# Shared on-disk embedding cache
+@st.cache_resource
+def get_embedding_cache():
+    cache = EmbeddingCache(EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
+    get_telemetry().watch_cache("embedding", cache.stats)
+    return cache
+
+# Process-wide rate limit (requests per second) for embedding batches; 0 disables it
+@st.cache_resource
+def get_embedding_rate_limiter():
+    return TokenBucket(EMBEDDING_RATE_LIMIT) if EMBEDDING_RATE_LIMIT > 0 else None
+
+# Shared on-disk vector index store
+@st.cache_resource
+def get_index_store():
+    return IndexStore(INDEX_STORE_DIR)
+
+# Per-document chunk manifests, so unchanged files are never re-split
+@st.cache_resource
+def get_chunk_manifest_store():
+    return ChunkManifestStore(CHUNK_MANIFEST_DIR)
+
+# Process pool for parallel PDF page extraction
+@st.cache_resource
+def get_extraction_pool():
+    # Spawn rather than fork: the app process runs several threads
+    return ProcessPoolExecutor(
+        max_workers=EXTRACTION_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+# Semantic cache of answers, shared by all sessions
+@st.cache_resource
+def get_response_cache():
+    return SemanticResponseCache(
+        threshold=RESPONSE_CACHE_THRESHOLD,
+        ttl=RESPONSE_CACHE_TTL,
+        max_entries=RESPONSE_CACHE_MAX_ENTRIES
+    )
+
+# Optional cross-encoder reranker (needs sentence-transformers)
+@st.cache_resource
+def get_reranker():
+    return CrossEncoderReranker(RERANKER_MODEL) if RERANKER_MODEL else None
@@ -0,0 +1,13 @@
+import os
+import tempfile
+
+# Keep the caches, indexes and outbox written by the tests away from the app's
+_workdir = tempfile.TemporaryDirectory(prefix="chatbot-tests-")
+os.environ.setdefault("EMBEDDING_CACHE_PATH", os.path.join(_workdir.name, "embeddings.sqlite3"))
+os.environ.setdefault("INDEX_STORE_DIR", os.path.join(_workdir.name, "indexes"))
+os.environ.setdefault("CHUNK_MANIFEST_DIR", os.path.join(_workdir.name, "chunks"))
+os.environ.setdefault("OUTBOX_PATH", os.path.join(_workdir.name, "outbox.sqlite3"))
+
+
+def pytest_unconfigure(config):
+    _workdir.cleanup()
@@ -0,0 +1,34 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api.server import create_app
+from benchmarks.fakes import fake_booking_outbox
+from utils.outbox import set_booking_outbox
+
+BOOKING = {"name": "Ram Sharma", "phone": "9841234567", "email": "ram@example.com", "appointment_date": "2026-11-02"}
+
+
+@pytest.fixture
+def client(tmp_path):
+    outbox, _, _ = fake_booking_outbox(str(tmp_path / "outbox.sqlite3"))
+    set_booking_outbox(outbox)
+    yield TestClient(create_app())
+    outbox.stop()
+
+
+def test_booking_is_queued(client):
+    response = client.post("/bookings", json=BOOKING)
+    assert response.status_code == 201
+    assert client.get(f"/bookings/{response.json()['booking_id']}").json()["name"] == "Ram Sharma"
+
+
+@pytest.mark.parametrize("field, value, detail", [
+    ("name", "  ", "Missing name"),
+    ("email", "ram@example", "Invalid email format. Please provide a valid email address."),
+    ("phone", "12345", "Invalid phone number. Please provide a valid phone number."),
+    ("appointment_date", "someday", "Could not understand the appointment date"),
+])
+def test_invalid_bookings_are_rejected(client, field, value, detail):
+    response = client.post("/bookings", json={**BOOKING, field: value})
+    assert response.status_code == 422
+    assert response.json()["detail"] == detail
@@ -0,0 +1,73 @@
+import io
+from dataclasses import replace
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from agents.chatbot_agent import AgentResources, ChatbotAgent, ConversationState, SessionContext
+from agents.router import Route
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from utils.document_processor import DocumentProcessor
+from utils.index_manager import IndexManager
+from utils.response_cache import SemanticResponseCache
+
+QUESTION = "How many days do refunds take under the refund policy?"
+
+
+@pytest.fixture
+def resources():
+    resources = AgentResources.build(FakeChatModel(latency=0.0, token_latency=0.0))
+    # A cache per test instead of the process-wide one
+    return replace(resources, response_cache=SemanticResponseCache())
+
+
+@pytest.fixture
+def session():
+    processor = DocumentProcessor(embeddings=FakeEmbeddings(), embedding_model="fake-embeddings")
+    session = SessionContext(processor, IndexManager(processor))
+    upload = io.BytesIO(b"Under the refund policy refunds take ten days.\n\n"
+                        b"The office opens at nine and closes at five.\n" * 10)
+    upload.name = "policy.txt"
+    assert ChatbotAgent(None, session).load_documents([upload])
+    return session
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_document_answers_are_cached_after_small_talk(resources, session, stream):
+    chatbot = ChatbotAgent(resources, session)
+    ask = (lambda query: "".join(chatbot.stream_response(query))) if stream else chatbot.get_response
+
+    ask("hi")
+    assert chatbot._route(QUESTION).route == Route.DOCUMENT
+    first = ask(QUESTION)
+    assert resources.response_cache.stats()["misses"] == 1
+
+    assert ask(QUESTION) == first
+    assert resources.response_cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_failed_document_answer_falls_back_to_the_agent(resources, session, stream):
+    def fail(inputs):
+        raise ConnectionError("model unavailable")
+
+    resources = replace(resources, document_chain=RunnableLambda(fail))
+    chatbot = ChatbotAgent(resources, session)
+    assert chatbot._route(QUESTION).route == Route.DOCUMENT
+
+    answer = "".join(chatbot.stream_response(QUESTION)) if stream else chatbot.get_response(QUESTION)
+
+    assert answer
+    assert "model unavailable" not in answer
+
+
+def test_resources_without_bookings_answer_booking_requests(session):
+    resources = AgentResources.build(FakeChatModel(latency=0.0, token_latency=0.0), bookings=False)
+    chatbot = ChatbotAgent(resources, session)
+    request = "Call me tomorrow, I'm Ram Sharma, 9841234567, ram@example.com"
+
+    assert chatbot._route(request).route in (Route.DOCUMENT, Route.AGENT)
+    assert "book_appointment_tool" not in [tool.name for tool in resources.tools]
+    chatbot.get_response(request)
+    assert chatbot.session.conversation_state == ConversationState.GENERAL
+    assert not chatbot.session.user_info.name
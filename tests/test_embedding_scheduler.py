@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeEmbeddings, FakeServiceError
+from utils.embedding_scheduler import EmbeddingScheduler, TokenBucket
+
+
+class TrackingEmbeddings(FakeEmbeddings):
+    """FakeEmbeddings recording batch sizes and the peak number of requests in flight"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._flight_lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._flight_lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.batches.append(len(texts))
+        try:
+            return super().embed_documents(texts)
+        finally:
+            with self._flight_lock:
+                self.in_flight -= 1
+
+
+class FlakyEmbeddings(FakeEmbeddings):
+    """FakeEmbeddings failing the first `failures` requests"""
+
+    def __init__(self, failures: int, **kwargs):
+        super().__init__(**kwargs)
+        self.remaining_failures = failures
+
+    def embed_documents(self, texts):
+        with self._lock:
+            fail = self.remaining_failures > 0
+            self.remaining_failures -= fail
+        if fail:
+            self._call("embed_documents")
+            raise FakeServiceError("Injected failure in embed_documents")
+        return super().embed_documents(texts)
+
+
+def texts(n):
+    return [f"chunk number {i} about topic {i % 7}" for i in range(n)]
+
+
+def test_batches_preserve_order_and_report_progress():
+    embeddings = TrackingEmbeddings()
+    progress = []
+    scheduler = EmbeddingScheduler(embeddings, batch_size=50, max_concurrency=2,
+                                   progress_callback=lambda done, total: progress.append((done, total)))
+
+    vectors = scheduler.embed_documents(texts(130))
+
+    assert sorted(embeddings.batches) == [30, 50, 50]
+    assert vectors == FakeEmbeddings().embed_documents(texts(130))
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+    assert progress[-1] == (130, 130)
+
+
+def test_empty_input_makes_no_requests():
+    embeddings = TrackingEmbeddings()
+    assert EmbeddingScheduler(embeddings).embed_documents([]) == []
+    assert embeddings.calls == 0
+
+
+def test_batches_run_concurrently_up_to_the_limit():
+    embeddings = TrackingEmbeddings(latency=0.1)
+    scheduler = EmbeddingScheduler(embeddings, batch_size=10, max_concurrency=3)
+
+    started = time.perf_counter()
+    scheduler.embed_documents(texts(90))
+    elapsed = time.perf_counter() - started
+
+    assert len(embeddings.batches) == 9
+    assert embeddings.peak_in_flight == 3
+    # Nine 100 ms batches, three at a time
+    assert 0.3 <= elapsed < 0.8
+
+
+def test_failed_batches_are_retried_with_backoff():
+    embeddings = FlakyEmbeddings(failures=2, latency=0.01)
+    scheduler = EmbeddingScheduler(embeddings, batch_size=100, max_retries=3, backoff=0.05)
+
+    started = time.perf_counter()
+    vectors = scheduler.embed_documents(texts(10))
+    elapsed = time.perf_counter() - started
+
+    assert len(vectors) == 10
+    assert embeddings.calls == 3
+    # Backoff of 0.05 then 0.1 s, each jittered by a factor of 0.5-1.5
+    assert elapsed >= (0.05 + 0.1) * 0.5
+
+
+def test_retries_are_bounded():
+    embeddings = FlakyEmbeddings(failures=10)
+    scheduler = EmbeddingScheduler(embeddings, batch_size=100, max_retries=2, backoff=0.01)
+
+    with pytest.raises(FakeServiceError):
+        scheduler.embed_documents(texts(10))
+    assert embeddings.calls == 3
+
+
+def test_rate_limiter_spaces_out_requests():
+    embeddings = TrackingEmbeddings()
+    scheduler = EmbeddingScheduler(embeddings, batch_size=10, max_concurrency=4,
+                                   rate_limiter=TokenBucket(rate=20, capacity=1))
+
+    started = time.perf_counter()
+    scheduler.embed_documents(texts(60))
+    elapsed = time.perf_counter() - started
+
+    # One request straight away, then one every 50 ms
+    assert len(embeddings.batches) == 6
+    assert elapsed >= 5 / 20 * 0.9
+
+
+def test_token_bucket_allows_bursts_up_to_capacity():
+    bucket = TokenBucket(rate=10, capacity=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+@pytest.mark.parametrize("rate", [0, -1])
+def test_token_bucket_without_a_rate_never_waits(rate):
+    bucket = TokenBucket(rate=rate)
+    assert all(bucket.reserve() == 0.0 for _ in range(100))
@@ -0,0 +1,21 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.import_time import DEFERRED_MODULES, ENTRY_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("module", ENTRY_MODULES)
+def test_heavy_modules_are_not_imported_at_startup(module):
+    # A fresh interpreter: this process has imported most of them already
+    code = f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    imported = set(json.loads(result.stdout.splitlines()[-1]))
+    assert [deferred for deferred in DEFERRED_MODULES if deferred in imported] == []
@@ -0,0 +1,78 @@
+from datetime import date
+
+import pytest
+
+from agents.intents import Intent, IntentMatcher, SlotExtractor
+from utils.validators import Validators
+
+matcher = IntentMatcher()
+
+
+@pytest.mark.parametrize("text", [
+    "Call me please",
+    "can someone ring me back?",
+    "could somebody contact me about pricing",
+    "get in touch with me at ram@example.com",
+    "I'd like to book an appointment for next monday",
+    "I’d like to book a call",
+    "we would like to arrange a meeting",
+    "I want a callback",
+    "I need an appointment",
+    "I want to make an appointment",
+    "book me a consultation",
+    "please schedule a call tomorrow",
+    "Can you set up a meeting?",
+    "Hi, I'm Ram, call me on 9841234567 tomorrow",
+])
+def test_booking_requests(text):
+    assert matcher.classify(text) == Intent.BOOKING
+
+
+@pytest.mark.parametrize("text", [
+    "How can customers contact us?",
+    "What is the procedure to schedule a meeting with HR?",
+    "Can I make a call from the app?",
+    "I want to make a call from the app",
+    "how do I call the API from python",
+    "Who should I contact about refunds?",
+    "I need the meeting minutes from March",
+    "please get the meeting notes",
+    "how to get a call back from support",
+])
+def test_document_questions_are_not_bookings(text):
+    assert matcher.classify(text) == Intent.QA
+
+
+@pytest.mark.parametrize("text, kind", [
+    ("hi", "greeting"),
+    ("good morning", "greeting"),
+    ("what can you do?", "greeting"),
+    ("Thank you so much!", "thanks"),
+    ("thx", "thanks"),
+    ("bye", "farewell"),
+    ("see you again", "farewell"),
+    ("ok", "acknowledgement"),
+    ("great!", "acknowledgement"),
+])
+def test_smalltalk_kinds(text, kind):
+    assert matcher.classify(text) == Intent.SMALLTALK
+    assert matcher.smalltalk_kind(text) == kind
+
+
+@pytest.mark.parametrize("text, slots", [
+    ("Call me Monday", {"appointment_date": "2026-11-02"}),
+    ("Call me Tomorrow", {"appointment_date": "2026-10-30"}),
+    ("Please call me ASAP", {}),
+    ("I am Available tomorrow", {"appointment_date": "2026-10-30"}),
+    ("Hi, I am Ram. Call me Friday", {"name": "Ram", "appointment_date": "2026-10-30"}),
+    ("My name is ram sharma", {"name": "ram sharma"}),
+    ("my name is ram and my phone is 9841234567", {"name": "ram", "phone": "9841234567"}),
+    ("Hi, I'm Ram Sharma, call me on 9841234567 tomorrow",
+     {"name": "Ram Sharma", "phone": "9841234567", "appointment_date": "2026-10-30"}),
+    ("This is John Smith", {"name": "John Smith"}),
+])
+def test_slot_extraction(text, slots, monkeypatch):
+    # Thursday, 29 October 2026
+    parse = Validators.parse_date_from_text
+    monkeypatch.setattr(Validators, "parse_date_from_text", lambda text: parse(text, now=date(2026, 10, 29)))
+    assert SlotExtractor().extract(text) == slots
@@ -0,0 +1,148 @@
+import threading
+import time
+
+from utils.outbox import BookingOutbox
+
+BOOKING = ("Ram Sharma", "9841234567", "ram@example.com", "2026-11-02")
+
+
+class Sheet:
+    """append_rows stand-in that fails while `down` is set"""
+
+    def __init__(self, down=False):
+        self.down = down
+        self.rows = []
+
+    def append_rows(self, rows):
+        if self.down:
+            raise ConnectionError("sheet unavailable")
+        self.rows.extend(rows)
+
+
+class Mailer:
+    def __init__(self):
+        self.sent = []
+
+    def send_emails(self, bookings):
+        self.sent.extend(bookings)
+        return [None] * len(bookings)
+
+
+def make_outbox(tmp_path, sheet, mailer, max_attempts=2):
+    # No workers are started; tests process due bookings with drain()
+    return BookingOutbox(str(tmp_path / "outbox.sqlite3"), sheet.append_rows, mailer.send_emails,
+                         max_attempts=max_attempts, backoff=0.0)
+
+
+def test_booking_is_processed_once(tmp_path):
+    sheet, mailer = Sheet(), Mailer()
+    outbox = make_outbox(tmp_path, sheet, mailer)
+
+    booking_id = outbox.enqueue(*BOOKING)
+    assert outbox.enqueue(*BOOKING) == booking_id
+    outbox.drain()
+    outbox.enqueue(*BOOKING)
+    outbox.drain()
+
+    assert outbox.status(booking_id)["status"] == "done"
+    assert len(sheet.rows) == 1
+    assert len(mailer.sent) == 1
+
+
+def test_resubmitted_failed_booking_is_retried(tmp_path):
+    sheet, mailer = Sheet(down=True), Mailer()
+    outbox = make_outbox(tmp_path, sheet, mailer)
+
+    booking_id = outbox.enqueue(*BOOKING)
+    outbox.drain()
+    outbox.drain()
+    failed = outbox.status(booking_id)
+    assert failed["status"] == "failed"
+    assert failed["attempts"] == 2
+    assert "sheet unavailable" in failed["last_error"]
+
+    sheet.down = False
+    assert outbox.enqueue(*BOOKING) == booking_id
+    requeued = outbox.status(booking_id)
+    assert requeued["status"] == "pending"
+    assert requeued["attempts"] == 0
+    assert requeued["last_error"] is None
+
+    assert outbox.drain() == 1
+    assert outbox.status(booking_id)["status"] == "done"
+    assert len(sheet.rows) == 1
+    assert len(mailer.sent) == 1
+
+
+def test_retry_keeps_completed_steps(tmp_path):
+    sheet, mailer = Sheet(), Mailer()
+    failures = iter([ConnectionError("smtp down")] * 2)
+    outbox = make_outbox(tmp_path, sheet, mailer)
+    outbox.send_emails = lambda bookings: [next(failures, None) for _ in bookings]
+
+    booking_id = outbox.enqueue(*BOOKING)
+    outbox.drain()
+    outbox.drain()
+    assert outbox.status(booking_id)["status"] == "failed"
+
+    outbox.send_emails = mailer.send_emails
+    outbox.enqueue(*BOOKING)
+    outbox.drain()
+
+    assert outbox.status(booking_id)["status"] == "done"
+    # The sheet row was written on the first attempt and is not appended again
+    assert len(sheet.rows) == 1
+    assert len(mailer.sent) == 1
+
+
+def test_enqueue_many_reports_each_bookings_status(tmp_path):
+    sheet, mailer = Sheet(down=True), Mailer()
+    outbox = make_outbox(tmp_path, sheet, mailer, max_attempts=1)
+    done = ("Sita Rai", "9801234567", "sita@example.com", "2026-11-03")
+    new = ("Hari Thapa", "9812345678", "hari@example.com", "2026-11-04")
+
+    failed_id = outbox.enqueue(*BOOKING)
+    outbox.drain()
+    assert outbox.status(failed_id)["status"] == "failed"
+    sheet.down = False
+    done_id = outbox.enqueue(*done)
+    outbox.drain()
+
+    recorded = outbox.enqueue_many([BOOKING, done, new])
+
+    assert recorded == [(failed_id, "pending"), (done_id, "done"), (outbox.booking_id(*new), "pending")]
+    assert outbox.drain() == 2
+    # The done booking is not written again
+    assert [row[0] for row in sheet.rows] == ["Sita Rai", "Ram Sharma", "Hari Thapa"]
+
+
+def test_workers_still_busy_after_stop_are_not_doubled(tmp_path):
+    sheet, mailer = Sheet(), Mailer()
+    outbox = make_outbox(tmp_path, sheet, mailer)
+    busy, release = threading.Event(), threading.Event()
+
+    def slow_append_rows(rows):
+        busy.set()
+        release.wait(5)
+        sheet.append_rows(rows)
+
+    outbox.append_rows = slow_append_rows
+    outbox.enqueue(*BOOKING)
+    outbox.start()
+    assert busy.wait(5)
+
+    outbox.stop(timeout=0.05)
+    outbox.start()
+    # The busy worker still sees the stop flag and no second worker runs
+    assert len([t for t in threading.enumerate() if t.name.startswith("booking-outbox")]) == 1
+
+    release.set()
+    outbox.stop()
+    assert not [t for t in threading.enumerate() if t.name.startswith("booking-outbox")]
+    outbox.start()
+    outbox.enqueue("Sita Rai", "9801234567", "sita@example.com", "2026-11-03")
+    deadline = time.monotonic() + 5
+    while outbox.stats().get("pending") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    outbox.stop()
+    assert [row[0] for row in sheet.rows] == ["Ram Sharma", "Sita Rai"]
@@ -1,31 +1,34 @@
+from typing import Optional
 from langchain_core.tools import tool
 from utils.validators import Validators
-from utils.sheets import append_to_google_sheet
-from utils.emailer import send_confirmation_email
+from utils.outbox import get_booking_outbox
 
-@tool
-def book_appointment_tool(name: str, phone: str, email: str, appointment_date: str) -> str:
-    """Book an appointment with the provided user information"""
-    # Validate email and phone
+def validate_booking(phone: str, email: str) -> Optional[str]:
+    """Return why a booking's contact details are invalid, or None"""
     if not Validators.validate_email(email):
         return "Invalid email format. Please provide a valid email address."
     
     if not Validators.validate_phone(phone):
         return "Invalid phone number. Please provide a valid phone number."
-    
-    try:
-        append_to_google_sheet(name, phone, email, appointment_date)
-    except Exception as e:
-        return f"⚠️ Could not log to Google Sheet: {e}"
+    return None
 
+@tool
+def book_appointment_tool(name: str, phone: str, email: str, appointment_date: str) -> str:
+    """Book an appointment with the provided user information"""
+    error = validate_booking(phone, email)
+    if error:
+        return error
+    
+    # Sheet logging and the confirmation email happen in the background
     try:
-        send_confirmation_email(email, name, appointment_date)
+        booking_id = get_booking_outbox().enqueue(name, phone, email, appointment_date)
     except Exception as e:
-        return "⚠️ Booked, but failed to send email"
+        return f"⚠️ Could not record the booking: {e}"
     
     return f"""
     ✅ Appointment Successfully Booked!
     
+    Booking ID: {booking_id}
     Name: {name}
     Phone: {phone}
     Email: {email}
@@ -1,10 +1,39 @@
-import os
-import json
-from oauth2client.service_account import ServiceAccountCredentials
-import gspread
-from dotenv import load_dotenv
 import streamlit as st
-from agents.chatbot_agent import ChatbotAgent, UserInfo, ConversationState
+from agents.chatbot_agent import ChatbotAgent, ConversationState
+from config.settings import get_embedding_cache, get_response_cache, CHAT_PAGE_SIZE, CHAT_HISTORY_MAX
+from utils.telemetry import get_telemetry
+
+
+def render_messages(messages):
+    for message in messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+
+def render_history(messages, page_size: int = CHAT_PAGE_SIZE):
+    """Render the latest page of messages; older pages only on request"""
+    older = len(messages) - page_size
+    if older > 0:
+        pages = -(-older // page_size)
+        page = st.number_input(
+            f"Earlier messages: page 1-{pages}, newest first (0 hides them)",
+            min_value=0, max_value=pages, value=0, step=1,
+            # The label changes with the page count; keep the widget's state
+            key="history_page"
+        )
+        if page:
+            stop = older - (page - 1) * page_size
+            render_messages(messages[max(stop - page_size, 0):stop])
+            st.divider()
+    render_messages(messages[-page_size:])
+
+
+def append_message(role: str, content: str):
+    messages = st.session_state.messages
+    messages.append({"role": role, "content": content})
+    # The model only sees the bounded conversation memory; keep the
+    # displayed transcript bounded too
+    del messages[:-CHAT_HISTORY_MAX]
 
 
 def main():
@@ -22,10 +51,6 @@ def main():
         st.session_state.chatbot = ChatbotAgent()
     if 'messages' not in st.session_state:
         st.session_state.messages = []
-    if 'user_info' not in st.session_state:
-        st.session_state.user_info = UserInfo()
-    if 'conversation_state' not in st.session_state:
-        st.session_state.conversation_state = ConversationState.GENERAL
     
     # Sidebar for document upload
     with st.sidebar:
@@ -37,18 +62,26 @@ def main():
             help="Upload documents that the chatbot can reference to answer your questions."
         )
 
-        # Auto-process when new files are uploaded
-        if uploaded_files:
-            # ensure we only process once per session or when files change
-            uploaded_names = [f.name for f in uploaded_files]
-            if st.session_state.get('last_uploaded_names') != uploaded_names:
-                st.session_state.last_uploaded_names = uploaded_names
+        # Auto-process when the uploaded file set changes; only added or
+        # removed files are (re-)indexed
+        uploaded_names = [f.name for f in uploaded_files] if uploaded_files else []
+        if st.session_state.get('last_uploaded_names', []) != uploaded_names:
+            st.session_state.last_uploaded_names = uploaded_names
+            if uploaded_files:
                 with st.spinner("Processing documents..."):
-                    success = st.session_state.chatbot.load_documents(uploaded_files)
+                    progress = st.progress(0.0)
+
+                    def report_progress(done, total):
+                        progress.progress(done / total, text=f"Embedded {done}/{total} new chunks")
+
+                    success = st.session_state.chatbot.load_documents(uploaded_files, report_progress)
+                    progress.empty()
                     if success:
                         st.success(f"Successfully processed {len(uploaded_files)} document(s)!")
                     else:
                         st.error("Failed to process documents. Please try again.")
+            else:
+                st.session_state.chatbot.load_documents([])
 
         st.markdown("---")
         st.header("ℹ️ Features")
@@ -59,47 +92,51 @@ def main():
         - **Natural Language**: Understands "next Monday", "tomorrow", etc.
         """
         )
+
+        with st.expander("📊 Performance"):
+            response_stats = get_response_cache().stats()
+            embedding_stats = get_embedding_cache().stats()
+            st.metric("Response cache hit rate", f"{response_stats['hit_rate']:.0%}")
+            st.metric("Latency saved by cache", f"{response_stats['saved_seconds']:.1f}s")
+            st.metric("Embedding cache hit rate", f"{embedding_stats['hit_rate']:.0%}")
+            stages = get_telemetry().stage_summary()
+            if stages:
+                st.caption("Stage latency (approximate percentiles)")
+                st.dataframe(stages, hide_index=True)
         
         if st.button("Clear Chat History"):
             st.session_state.messages = []
-            st.session_state.user_info = UserInfo()
-            st.session_state.conversation_state = ConversationState.GENERAL
+            st.session_state.chatbot.session.reset_conversation()
             st.session_state.last_uploaded_names = []
             st.rerun()
     
     # Main chat interface
     st.header("💬 Chat Interface")
     
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+    render_history(st.session_state.messages)
     
     if prompt := st.chat_input("Ask me anything or say 'call me' to book an appointment..."):
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        append_message("user", prompt)
         with st.chat_message("user"):
             st.markdown(prompt)
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                response, new_state = st.session_state.chatbot.get_response(
-                    prompt, 
-                    st.session_state.user_info, 
-                    st.session_state.conversation_state
-                )
-                st.session_state.conversation_state = new_state
-                st.markdown(response)
-        st.session_state.messages.append({"role": "assistant", "content": response})
+            stream = st.session_state.chatbot.stream_response(prompt)
+            st.write_stream(stream)
+            response = stream.text
+        append_message("assistant", response)
     
-    if st.session_state.conversation_state != ConversationState.GENERAL:
-        st.info(f"Current state: {st.session_state.conversation_state.value}")
+    session = st.session_state.chatbot.session
+    if session.conversation_state != ConversationState.GENERAL:
+        st.info(f"Current state: {session.conversation_state.value}")
         info_display = []
-        if st.session_state.user_info.name:
-            info_display.append(f"Name: {st.session_state.user_info.name}")
-        if st.session_state.user_info.phone:
-            info_display.append(f"Phone: {st.session_state.user_info.phone}")
-        if st.session_state.user_info.email:
-            info_display.append(f"Email: {st.session_state.user_info.email}")
-        if st.session_state.user_info.appointment_date:
-            info_display.append(f"Date: {st.session_state.user_info.appointment_date}")
+        if session.user_info.name:
+            info_display.append(f"Name: {session.user_info.name}")
+        if session.user_info.phone:
+            info_display.append(f"Phone: {session.user_info.phone}")
+        if session.user_info.email:
+            info_display.append(f"Email: {session.user_info.email}")
+        if session.user_info.appointment_date:
+            info_display.append(f"Date: {session.user_info.appointment_date}")
         if info_display:
             st.info("Collected Information: " + " | ".join(info_display))
 
@@ -0,0 +1,131 @@
+import json
+import os
+import re
+import uuid
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# Markdown-style headings in plain text files
+TXT_HEADING_PATTERN = re.compile(r"^#{1,6}\s+\S.*$", re.MULTILINE)
+
+
+@dataclass
+class Section:
+    """A structural unit of a document: a PDF page, a DOCX/TXT heading section"""
+    text: str
+    page: Optional[int] = None
+
+
+@dataclass
+class Chunk:
+    text: str
+    # Character offset of the chunk in the document's extracted text
+    offset: int
+    page: Optional[int] = None
+
+    def metadata(self, doc_hash: str, source: str) -> dict:
+        metadata = {"doc_hash": doc_hash, "source": source, "offset": self.offset}
+        if self.page is not None:
+            metadata["page"] = self.page
+        return metadata
+
+
+def split_txt_sections(text: str) -> Iterator[Section]:
+    """Split plain text at markdown-style headings"""
+    starts = [match.start() for match in TXT_HEADING_PATTERN.finditer(text)]
+    bounds = [0] + [start for start in starts if start > 0] + [len(text)]
+    for start, stop in zip(bounds, bounds[1:]):
+        yield Section(text[start:stop])
+
+
+class StructuredChunker:
+    """Split documents along their structure before splitting by size.
+
+    Consecutive sections are packed together while they fit in one chunk
+    (or while the group is under half a chunk), so short pages and sections
+    do not each become a tiny chunk; larger
+    groups are split with the recursive splitter. Chunks never span the
+    boundary between two groups, so a chunk starting on a page does not
+    drag in an unrelated section. Every chunk records its character offset
+    and, for PDFs, the page it starts on.
+    """
+
+    VERSION = 1
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+            add_start_index=True,
+        )
+
+    @property
+    def key(self) -> str:
+        return f"structured-v{self.VERSION}:{self.chunk_size}:{self.chunk_overlap}"
+
+    def chunk(self, sections: Iterable[Section]) -> Iterator[Chunk]:
+        group: List[Section] = []
+        group_size = 0
+        offset = 0
+        for section in sections:
+            # Start a new group when the section does not fit, unless the
+            # current one is so small it would become a fragment of its own
+            if group and group_size + len(section.text) > self.chunk_size and group_size >= self.chunk_size // 2:
+                yield from self._split_group(group, offset)
+                offset += group_size
+                group, group_size = [], 0
+            group.append(section)
+            group_size += len(section.text)
+        if group:
+            yield from self._split_group(group, offset)
+
+    def _split_group(self, group: List[Section], offset: int) -> Iterator[Chunk]:
+        text = "".join(section.text for section in group)
+        if not text.strip():
+            return
+        starts, position = [], 0
+        for section in group:
+            starts.append(position)
+            position += len(section.text)
+
+        for doc in self.text_splitter.create_documents([text]):
+            start = doc.metadata["start_index"]
+            # Page of the section the chunk starts in
+            page = group[max(bisect_right(starts, max(start, 0)) - 1, 0)].page
+            yield Chunk(doc.page_content, offset + start, page)
+
+
+class ChunkManifestStore:
+    """Per-document chunk manifests on disk, keyed by content hash and chunker.
+
+    A document whose manifest exists is never parsed or split again.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, doc_hash: str, chunker_key: str) -> str:
+        return os.path.join(self.root, chunker_key.replace(":", "_"), f"{doc_hash}.json")
+
+    def load(self, doc_hash: str, chunker_key: str) -> Optional[List[Chunk]]:
+        try:
+            with open(self._path(doc_hash, chunker_key), encoding="utf-8") as f:
+                rows = json.load(f)["chunks"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return [Chunk(text, offset, page) for text, offset, page in rows]
+
+    def save(self, doc_hash: str, chunker_key: str, chunks: List[Chunk]) -> None:
+        path = self._path(doc_hash, chunker_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"chunks": [[chunk.text, chunk.offset, chunk.page] for chunk in chunks]},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
@@ -0,0 +1,135 @@
+import hashlib
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from langchain_core.documents import Document
+
+# Words, numbers and single punctuation marks
+PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Local estimate of an LLM tokenizer's count: one token per ~4 characters of each word"""
+    return sum(math.ceil(len(piece) / 4) for piece in PIECE_PATTERN.findall(text))
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """Longest prefix of `text`, cut between words, estimated at no more than `budget` tokens"""
+    used = 0
+    for match in PIECE_PATTERN.finditer(text):
+        used += math.ceil(len(match.group(0)) / 4)
+        if used > budget:
+            return text[:match.start()].rstrip()
+    return text
+
+
+def overlap_length(left: str, right: str, max_overlap: int = 1000) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right`"""
+    for length in range(min(len(left), len(right), max_overlap), 0, -1):
+        if left.endswith(right[:length]):
+            return length
+    return 0
+
+
+@dataclass
+class _Chunk:
+    rank: int
+    doc: Document
+    doc_key: str
+    index: Optional[int]
+    text: str
+
+
+class ContextPacker:
+    """Pack retrieved chunks into a token budget for the "stuff" chain.
+
+    Chunks are taken in relevance order while they fit `token_budget`.
+    Exact and contained duplicates are dropped, and the text a chunk shares
+    with an already selected neighbour (the splitter's overlap) is not
+    counted. Selected neighbours from the same document are then merged
+    into one passage, without the overlapping text.
+    """
+
+    def __init__(self, token_budget: int = 1500, max_overlap: int = 1000):
+        self.token_budget = token_budget
+        self.max_overlap = max_overlap
+
+    def pack(self, documents: Sequence[Document]) -> List[Document]:
+        chunks = [self._chunk(rank, doc) for rank, doc in enumerate(documents)]
+        selected: List[_Chunk] = []
+        by_position: Dict[tuple, _Chunk] = {}
+        seen = set()
+        used = 0
+
+        for chunk in chunks:
+            normalized = WHITESPACE_PATTERN.sub(" ", chunk.text).strip()
+            digest = hashlib.sha1(normalized.encode("utf-8")).digest()
+            if digest in seen or any(normalized in WHITESPACE_PATTERN.sub(" ", other.text) for other in selected):
+                continue
+
+            cost = estimate_tokens(self._new_text(chunk, by_position))
+            if used + cost > self.token_budget:
+                if selected:
+                    continue
+                # Always send something: cut the most relevant chunk to size
+                chunk.text = truncate_tokens(chunk.text, self.token_budget)
+                cost = estimate_tokens(chunk.text)
+            selected.append(chunk)
+            seen.add(digest)
+            if chunk.index is not None:
+                by_position[(chunk.doc_key, chunk.index)] = chunk
+            used += cost
+
+        return self._merge(selected)
+
+    @staticmethod
+    def _chunk(rank: int, doc: Document) -> _Chunk:
+        doc_key = doc.metadata.get("doc_hash") or doc.metadata.get("source") or ""
+        index = None
+        # Chunk ids are "<doc hash>:<position in document>"
+        if doc.id and ":" in doc.id:
+            head, _, tail = doc.id.rpartition(":")
+            if tail.isdigit():
+                doc_key, index = doc_key or head, int(tail)
+        return _Chunk(rank, doc, doc_key, index, doc.page_content)
+
+    def _new_text(self, chunk: _Chunk, by_position: Dict[tuple, _Chunk]) -> str:
+        """The part of a chunk not already covered by its selected neighbours"""
+        text = chunk.text
+        if chunk.index is None:
+            return text
+        previous = by_position.get((chunk.doc_key, chunk.index - 1))
+        if previous is not None:
+            text = text[overlap_length(previous.text, text, self.max_overlap):]
+        following = by_position.get((chunk.doc_key, chunk.index + 1))
+        if following is not None:
+            cut = overlap_length(text, following.text, self.max_overlap)
+            text = text[:len(text) - cut]
+        return text
+
+    def _merge(self, selected: List[_Chunk]) -> List[Document]:
+        """Join runs of consecutive chunks per document; passages keep relevance order"""
+        runs: List[List[_Chunk]] = []
+        for chunk in sorted(selected, key=lambda c: (c.doc_key, c.index if c.index is not None else -1, c.rank)):
+            run = runs[-1] if runs else None
+            if (run and chunk.index is not None and run[-1].index is not None
+                    and run[-1].doc_key == chunk.doc_key and chunk.index == run[-1].index + 1):
+                run.append(chunk)
+            else:
+                runs.append([chunk])
+
+        passages = []
+        for run in sorted(runs, key=lambda r: min(c.rank for c in r)):
+            text = run[0].text
+            for chunk in run[1:]:
+                overlap = overlap_length(text, chunk.text, self.max_overlap)
+                # Chunks from different sections share no text
+                text += chunk.text[overlap:] if overlap else "\n\n" + chunk.text
+            metadata = dict(run[0].doc.metadata)
+            if len(run) > 1:
+                metadata["chunks"] = [chunk.index for chunk in run]
+            passages.append(Document(page_content=text, metadata=metadata))
+        return passages
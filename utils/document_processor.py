@@ -1,27 +1,126 @@
+import hashlib
+import io
+import os
+import tempfile
+from collections import deque
 import streamlit as st
-import PyPDF2
-import docx
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
-from config.settings import get_embeddings
-from typing import Optional
+from langchain_core.embeddings import Embeddings
+from config.settings import (
+    get_embeddings, get_embedding_cache, get_embedding_rate_limiter, get_extraction_pool, get_chunk_manifest_store,
+    EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_CONCURRENCY, EMBEDDING_MAX_RETRIES,
+    EXTRACTION_WORKERS
+)
+from utils.chunking import Chunk, ChunkManifestStore, Section, StructuredChunker, split_txt_sections
+from utils.embedding_cache import CachedEmbeddings
+from utils.embedding_scheduler import EmbeddingScheduler, ProgressCallback
+from utils.telemetry import get_telemetry
+from typing import Iterator, List, Optional
+
+# PDFs with fewer pages are extracted in-process
+PDF_PARALLEL_MIN_PAGES = 32
+PDF_PAGES_PER_TASK = 16
 
 class DocumentProcessor:
-    def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len
-        )
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 embeddings: Optional[Embeddings] = None, embedding_model: str = EMBEDDING_MODEL,
+                 manifest_store: Optional[ChunkManifestStore] = None):
+        # Called with (embedded, total) chunk counts while embedding
+        self.progress_callback: Optional[ProgressCallback] = None
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        # Defaults to the shared Gemini embeddings
+        self.embeddings = embeddings
+        self.embedding_model = embedding_model
+        self.chunker = StructuredChunker(chunk_size, chunk_overlap)
+        # Defaults to the shared on-disk manifest store
+        self.manifest_store = manifest_store
+
+    @property
+    def config_key(self) -> str:
+        """Identify the embedding model and chunking that produced an index"""
+        return f"{self.embedding_model}:{self.chunker.key}"
     
+    def iter_pdf_pages(self, pdf_file) -> Iterator[str]:
+        """Yield the text of each PDF page in order.
+
+        Large PDFs are fanned out across the shared process pool in page
+        ranges, with a bounded number of ranges in flight at a time.
+        """
+        # PDF and DOCX readers are imported when a file of that type arrives
+        import PyPDF2
+        from utils.pdf_extraction import extract_page_range
+
+        data = pdf_file.read()
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        page_count = len(reader.pages)
+        if page_count < PDF_PARALLEL_MIN_PAGES or EXTRACTION_WORKERS < 2:
+            for page in reader.pages:
+                yield page.extract_text() or ""
+            return
+
+        # Workers open the file by path instead of receiving the bytes per task
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(data)
+        del data, reader
+
+        pool = get_extraction_pool()
+        pending = deque()
+        try:
+            for start in range(0, page_count, PDF_PAGES_PER_TASK):
+                stop = min(start + PDF_PAGES_PER_TASK, page_count)
+                pending.append(pool.submit(extract_page_range, tmp.name, start, stop))
+                if len(pending) >= 2 * EXTRACTION_WORKERS:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            os.unlink(tmp.name)
+
+    def iter_docx_paragraphs(self, docx_file) -> Iterator[str]:
+        """Yield the text of each DOCX paragraph in order"""
+        import docx
+        doc = docx.Document(docx_file)
+        for paragraph in doc.paragraphs:
+            yield paragraph.text + "\n"
+
+    def iter_docx_sections(self, docx_file) -> Iterator[Section]:
+        """Yield one section per DOCX heading, holding the heading and its body"""
+        import docx
+        from docx.enum.style import WD_STYLE_TYPE
+        from docx.text.paragraph import Paragraph
+        doc = docx.Document(docx_file)
+
+        # paragraph.style scans the style table for every paragraph without an
+        # explicit style; resolve the heading styles once instead and read each
+        # paragraph's style id from its element (None means the default style)
+        def is_heading(style) -> bool:
+            return style is not None and (style.name.startswith("Heading") or style.name == "Title")
+
+        headings = {style.style_id for style in doc.styles
+                    if style.type == WD_STYLE_TYPE.PARAGRAPH and is_heading(style)}
+        if is_heading(doc.styles.default(WD_STYLE_TYPE.PARAGRAPH)):
+            headings.add(None)
+
+        lines: List[str] = []
+        for element in doc.element.body.p_lst:
+            if lines and element.style in headings:
+                yield Section("".join(lines))
+                lines = []
+            lines.append(Paragraph(element, doc).text + "\n")
+        if lines:
+            yield Section("".join(lines))
+
+    def iter_txt(self, txt_file) -> Iterator[str]:
+        """Yield the decoded content of a TXT file"""
+        yield str(txt_file.read(), "utf-8")
+
     def extract_text_from_pdf(self, pdf_file) -> str:
         """Extract text from PDF file"""
         try:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
+            return "".join(self.iter_pdf_pages(pdf_file))
         except Exception as e:
             st.error(f"Error reading PDF: {str(e)}")
             return ""
@@ -29,11 +128,7 @@ class DocumentProcessor:
     def extract_text_from_docx(self, docx_file) -> str:
         """Extract text from DOCX file"""
         try:
-            doc = docx.Document(docx_file)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            return "".join(self.iter_docx_paragraphs(docx_file))
         except Exception as e:
             st.error(f"Error reading DOCX: {str(e)}")
             return ""
@@ -41,11 +136,80 @@ class DocumentProcessor:
     def extract_text_from_txt(self, txt_file) -> str:
         """Extract text from TXT file"""
         try:
-            return str(txt_file.read(), "utf-8")
+            return "".join(self.iter_txt(txt_file))
         except Exception as e:
             st.error(f"Error reading TXT: {str(e)}")
             return ""
     
+    @staticmethod
+    def file_hash(uploaded_file) -> str:
+        """Return a content hash identifying an uploaded file"""
+        if hasattr(uploaded_file, "getvalue"):
+            data = uploaded_file.getvalue()
+        else:
+            data = uploaded_file.read()
+            uploaded_file.seek(0)
+        return hashlib.sha256(data).hexdigest()
+
+    def get_embedding_function(self) -> CachedEmbeddings:
+        """Return the cache-backed, batched embedding function used for indexing"""
+        scheduler = EmbeddingScheduler(
+            self.embeddings or get_embeddings(),
+            batch_size=EMBEDDING_BATCH_SIZE,
+            max_concurrency=EMBEDDING_CONCURRENCY,
+            rate_limiter=get_embedding_rate_limiter(),
+            max_retries=EMBEDDING_MAX_RETRIES,
+            progress_callback=self._report_progress,
+        )
+        return CachedEmbeddings(scheduler, get_embedding_cache(), self.embedding_model)
+
+    def _report_progress(self, done: int, total: int) -> None:
+        if self.progress_callback:
+            self.progress_callback(done, total)
+
+    def iter_sections(self, uploaded_file) -> Iterator[Section]:
+        """Yield the structural sections of an uploaded file; raises on parse errors"""
+        uploaded_file.seek(0)
+        file_extension = uploaded_file.name.split('.')[-1].lower()
+        if file_extension == 'pdf':
+            for number, page in enumerate(self.iter_pdf_pages(uploaded_file), start=1):
+                yield Section(page + "\n", page=number)
+        elif file_extension == 'docx':
+            yield from self.iter_docx_sections(uploaded_file)
+        elif file_extension == 'txt':
+            for text in self.iter_txt(uploaded_file):
+                yield from split_txt_sections(text)
+        else:
+            raise ValueError(f"Unsupported file type: {file_extension}")
+
+    def chunk_file(self, uploaded_file, doc_hash: Optional[str] = None) -> List[Chunk]:
+        """Chunk a file along its structure, reusing its cached chunk manifest"""
+        telemetry = get_telemetry()
+        manifest_store = self.manifest_store or get_chunk_manifest_store()
+        doc_hash = doc_hash or self.file_hash(uploaded_file)
+        chunks = manifest_store.load(doc_hash, self.chunker.key)
+        if chunks is not None:
+            telemetry.count("chunk_manifest_hits_total")
+            return chunks
+
+        try:
+            with telemetry.span("ingest.parse"):
+                chunks = list(self.chunker.chunk(
+                    telemetry.timed_iter("ingest.extract", self.iter_sections(uploaded_file))
+                ))
+        except Exception as e:
+            st.error(f"Error reading {uploaded_file.name}: {str(e)}")
+            return []
+        try:
+            manifest_store.save(doc_hash, self.chunker.key, chunks)
+        except OSError as e:
+            st.warning(f"Could not cache chunks of {uploaded_file.name}: {str(e)}")
+        return chunks
+
+    def split_file(self, uploaded_file) -> List[str]:
+        """Extract and split a single uploaded file into chunks"""
+        return [chunk.text for chunk in self.chunk_file(uploaded_file)]
+
     def process_documents(self, uploaded_files) -> Optional[FAISS]:
         """Process uploaded documents and create vector store"""
         if not uploaded_files:
@@ -54,28 +218,14 @@ class DocumentProcessor:
         all_texts = []
         
         for uploaded_file in uploaded_files:
-            file_extension = uploaded_file.name.split('.')[-1].lower()
-            
-            if file_extension == 'pdf':
-                text = self.extract_text_from_pdf(uploaded_file)
-            elif file_extension == 'docx':
-                text = self.extract_text_from_docx(uploaded_file)
-            elif file_extension == 'txt':
-                text = self.extract_text_from_txt(uploaded_file)
-            else:
-                st.warning(f"Unsupported file type: {file_extension}")
-                continue
-            
-            if text.strip():
-                chunks = self.text_splitter.split_text(text)
-                all_texts.extend(chunks)
+            all_texts.extend(self.split_file(uploaded_file))
         
         if not all_texts:
             return None
         
         try:
-            embeddings = get_embeddings()
-            vectorstore = FAISS.from_texts(all_texts, embeddings)
+            with get_telemetry().span("ingest.index"):
+                vectorstore = FAISS.from_texts(all_texts, self.get_embedding_function())
             return vectorstore
         except Exception as e:
             st.error(f"Error creating vector store: {str(e)}")
@@ -1,21 +1,200 @@
 import os
 import smtplib
+import threading
+import time
+from collections import deque
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import Callable, List, Optional, Sequence
 
-def send_confirmation_email(to_email, name, appointment_date):
-    """Send appointment confirmation email"""
-    host = os.getenv("SMTP_HOST")
-    port = int(os.getenv("SMTP_PORT", 587))
-    sender = os.getenv("SMTP_SENDER_EMAIL")
-    password = os.getenv("SMTP_SENDER_PASSWORD")
+from utils.telemetry import get_telemetry
+
+
+def is_connection_error(error: Exception) -> bool:
+    """Whether an error means the connection is unusable (not the message)"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        # 421: service closing the channel
+        return error.smtp_code == 421
+    # SMTPException subclasses OSError; anything else is a socket error
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class SMTPPool:
+    """Pool of authenticated SMTP connections kept alive between sends.
+
+    Connections idle for longer than `noop_after` seconds are checked with
+    NOOP before reuse and replaced when the server has dropped them, so a
+    send normally costs no connect, STARTTLS or login round-trips.
+    """
+
+    def __init__(self, host: str, port: int, sender: str, password: Optional[str],
+                 size: int = 2, use_tls: bool = True, noop_after: float = 10.0,
+                 connection_factory: Callable = smtplib.SMTP):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.password = password
+        self.use_tls = use_tls
+        self.noop_after = noop_after
+        self.connection_factory = connection_factory
+        self.sent = 0
+        self.failed = 0
+        self.connections_opened = 0
+        self.send_time = 0.0
+        self._idle = deque()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        server = self.connection_factory(self.host, self.port, timeout=30)
+        if self.use_tls:
+            server.starttls()
+        if self.password:
+            server.login(self.sender, self.password)
+        with self._lock:
+            self.connections_opened += 1
+        return server
+
+    @staticmethod
+    def _close(server) -> None:
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _acquire(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, last_used = self._idle.pop()
+            if time.monotonic() - last_used < self.noop_after:
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except Exception:
+                pass
+            self._close(server)
+        return self._connect()
+
+    def _release(self, server) -> None:
+        with self._lock:
+            self._idle.append((server, time.monotonic()))
+
+    def send(self, msg) -> None:
+        """Send one message, raising on failure"""
+        error = self.send_many([msg])[0]
+        if error is not None:
+            raise error
+
+    def send_many(self, messages: Sequence) -> List[Optional[Exception]]:
+        """Send messages over one pooled connection.
 
+        Returns one entry per message: None if it was sent, else the error.
+        """
+        results: List[Optional[Exception]] = []
+        started = time.perf_counter()
+        with self._slots:
+            server = None
+            try:
+                for msg in messages:
+                    try:
+                        if server is None:
+                            server = self._acquire()
+                        try:
+                            server.send_message(msg)
+                        except Exception as e:
+                            if not is_connection_error(e):
+                                raise
+                            # Stale connection: reconnect and retry once
+                            self._close(server)
+                            server = None
+                            server = self._connect()
+                            server.send_message(msg)
+                        results.append(None)
+                    except Exception as e:
+                        results.append(e)
+            finally:
+                if server is not None:
+                    self._release(server)
+
+        sent = sum(1 for result in results if result is None)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.sent += sent
+            self.failed += len(results) - sent
+            self.send_time += elapsed
+        telemetry = get_telemetry()
+        telemetry.observe("smtp.send", elapsed)
+        telemetry.count("emails_total", sent, result="sent")
+        telemetry.count("emails_total", len(results) - sent, result="failed")
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for server, _ in idle:
+            self._close(server)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sent": self.sent,
+                "failed": self.failed,
+                "connections_opened": self.connections_opened,
+                "messages_per_second": self.sent / self.send_time if self.send_time else 0.0,
+            }
+
+
+_pool: Optional[SMTPPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPPool:
+    """Return the process-wide SMTP pool configured from the environment"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SMTPPool(
+                os.getenv("SMTP_HOST"),
+                int(os.getenv("SMTP_PORT", 587)),
+                os.getenv("SMTP_SENDER_EMAIL"),
+                os.getenv("SMTP_SENDER_PASSWORD"),
+                size=int(os.getenv("SMTP_POOL_SIZE", 2)),
+            )
+        return _pool
+
+
+def build_confirmation_email(to_email, name, appointment_date, booking_id=None, sender=None, host=None):
+    """Build the appointment confirmation message"""
     body = f"Hi {name},\n\n✅ Your appointment is booked for {appointment_date}.\n\nThank you!"
+    if booking_id:
+        body += f"\n\nBooking ID: {booking_id}"
     msg = MIMEMultipart()
     msg["From"], msg["To"], msg["Subject"] = sender, to_email, "Appointment Confirmation"
+    if booking_id:
+        # Stable Message-ID so retried sends can be deduplicated downstream
+        msg["Message-ID"] = f"<booking-{booking_id}@{host}>"
     msg.attach(MIMEText(body, "plain"))
+    return msg
+
+
+def send_confirmation_email(to_email, name, appointment_date, booking_id=None):
+    """Send appointment confirmation email"""
+    pool = get_smtp_pool()
+    pool.send(build_confirmation_email(to_email, name, appointment_date, booking_id, pool.sender, pool.host))
+
 
-    with smtplib.SMTP(host, port) as server:
-        server.starttls()
-        server.login(sender, password)
-        server.send_message(msg)
+def send_confirmation_emails(bookings: Sequence[tuple]) -> List[Optional[Exception]]:
+    """Send confirmation emails for (to_email, name, appointment_date, booking_id) tuples"""
+    pool = get_smtp_pool()
+    return pool.send_many([
+        build_confirmation_email(to_email, name, appointment_date, booking_id, pool.sender, pool.host)
+        for to_email, name, appointment_date, booking_id in bookings
+    ])
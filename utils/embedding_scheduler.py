@@ -0,0 +1,121 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from utils.telemetry import get_telemetry
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all embedding calls in a process.
+
+    Callers reserve tokens up front and sleep for however long the bucket
+    needs to refill, so concurrent batches are spread out at `rate` per
+    second with bursts of up to `capacity`. A rate of zero or less means
+    no limit.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens and return how many seconds to wait before using them"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class EmbeddingScheduler(Embeddings):
+    """Embed documents in batches with bounded concurrency, rate limiting and
+    per-batch retries, reporting progress as batches complete.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        progress_callback: Optional[ProgressCallback] = None,
+    ):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.progress_callback = progress_callback
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        coro = self.aembed_documents(texts)
+        with get_telemetry().span("ingest.embed"):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(coro)
+            # Called from inside an event loop: run ours on a separate thread
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                return executor.submit(asyncio.run, coro).result()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.embeddings.aembed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        done = 0
+
+        async def run(batch: List[str]) -> List[List[float]]:
+            nonlocal done
+            async with semaphore:
+                vectors = await self._embed_batch(batch)
+            done += len(batch)
+            if self.progress_callback:
+                self.progress_callback(done, len(texts))
+            return vectors
+
+        results = await asyncio.gather(*(run(batch) for batch in batches))
+        return [vector for vectors in results for vector in vectors]
+
+    async def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            get_telemetry().count("embedding_requests_total")
+            try:
+                return await self.embeddings.aembed_documents(batch)
+            except Exception:
+                get_telemetry().count("embedding_failures_total")
+                if attempt == self.max_retries:
+                    raise
+                # Exponential backoff with jitter so retries don't align
+                await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
@@ -0,0 +1,243 @@
+import heapq
+import math
+import re
+import threading
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+# Words, numbers and codes such as "XJ-220" or "v2.1"
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+TOKEN_SPLIT_PATTERN = re.compile(r"[-_./]")
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have how i if in into is it
+its me my no not of on or our so than that the their them then there these they this those to was
+we were what when where which who why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms of a text; codes are kept whole and also split into parts"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token not in STOPWORDS:
+            tokens.append(token)
+        if TOKEN_SPLIT_PATTERN.search(token):
+            tokens.extend(part for part in TOKEN_SPLIT_PATTERN.split(token) if part and part not in STOPWORDS)
+    return tokens
+
+
+class BM25Index:
+    """In-memory inverted index scoring chunks with Okapi BM25.
+
+    Chunks are added and removed by id, so the index follows incremental
+    updates of the FAISS store it mirrors.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._terms: Dict[str, Counter] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    @classmethod
+    def from_documents(cls, items: Iterable[Tuple[str, str]]) -> "BM25Index":
+        index = cls()
+        for chunk_id, text in items:
+            index.add(chunk_id, text)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, chunk_id: str, text: str) -> None:
+        if chunk_id in self._terms:
+            self.remove(chunk_id)
+        terms = Counter(tokenize(text))
+        self._terms[chunk_id] = terms
+        length = sum(terms.values())
+        self._lengths[chunk_id] = length
+        self._total_length += length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[chunk_id] = tf
+
+    def remove(self, chunk_id: str) -> None:
+        terms = self._terms.pop(chunk_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(chunk_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[chunk_id]
+            if not postings:
+                del self._postings[term]
+
+    def idf(self, term: str) -> float:
+        n = len(self._lengths)
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 10) -> Tuple[List[Tuple[str, float]], float]:
+        """Top-k (chunk id, score) pairs and the best chunk's query coverage.
+
+        Coverage is the share of the query terms' IDF weight found in the
+        best chunk: near 1 when its rare terms (names, codes) all match,
+        near 0 when the query is about something the corpus lacks.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self._lengths:
+            return [], 0.0
+
+        avg_length = self._total_length / len(self._lengths)
+        weights = {term: self.idf(term) for term in terms}
+        scores: Dict[str, float] = {}
+        for term, weight in weights.items():
+            for chunk_id, tf in self._postings.get(term, {}).items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + weight * tf * (self.k1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        if not top:
+            return [], 0.0
+        best_terms = self._terms[top[0][0]]
+        coverage = sum(weight for term, weight in weights.items() if term in best_terms) / sum(weights.values())
+        return top, coverage
+
+
+_shared_indexes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_shared_lock = threading.Lock()
+
+
+def bm25_for_vectorstore(vectorstore, shared: bool = False) -> BM25Index:
+    """BM25 index over the chunks of a FAISS store.
+
+    Indexes of shared (read-only) stores are built once and reused by every
+    session holding the same store.
+    """
+    if shared:
+        with _shared_lock:
+            index = _shared_indexes.get(vectorstore)
+        if index is not None:
+            return index
+
+    docstore = vectorstore.docstore
+    index = BM25Index.from_documents(
+        (chunk_id, docstore.search(chunk_id).page_content)
+        for chunk_id in vectorstore.index_to_docstore_id.values()
+    )
+    if shared:
+        with _shared_lock:
+            index = _shared_indexes.setdefault(vectorstore, index)
+    return index
+
+
+class CrossEncoderReranker:
+    """Rescore (query, chunk) pairs with a small sentence-transformers cross-encoder on CPU"""
+
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+                self._model = CrossEncoder(self.model_name, device="cpu")
+            return self._model
+
+    def score(self, query: str, texts: Sequence[str]) -> List[float]:
+        logits = self._get_model().predict([(query, text) for text in texts])
+        return [1 / (1 + math.exp(-float(logit))) for logit in logits]
+
+
+@dataclass
+class RetrievalResult:
+    documents: List[Document] = field(default_factory=list)
+    scores: List[float] = field(default_factory=list)
+    # Best vector relevance and BM25 query coverage, used for routing
+    vector_score: Optional[float] = None
+    lexical_score: float = 0.0
+
+
+class HybridRetriever:
+    """Fuse FAISS similarity with BM25, optionally rerank, and pick k adaptively.
+
+    Candidates from both indexes are scored
+    `alpha * vector relevance + (1 - alpha) * BM25 / best BM25`; candidates
+    found only by BM25 get the lowest fetched vector relevance. Results are
+    kept from the top while they stay within `window` of the best score and
+    no consecutive drop exceeds `gap`, between `min_k` and `max_k` chunks.
+    """
+
+    def __init__(self, alpha: float = 0.7, fetch_k: int = 20, min_k: int = 1, max_k: int = 4,
+                 window: float = 0.15, gap: float = 0.08,
+                 reranker: Optional[CrossEncoderReranker] = None, rerank_k: int = 8):
+        self.alpha = alpha
+        self.fetch_k = fetch_k
+        self.min_k = min_k
+        self.max_k = max_k
+        self.window = window
+        self.gap = gap
+        self.reranker = reranker
+        self.rerank_k = rerank_k
+
+    def search(self, query: str, vectorstore, lexical_index: Optional[BM25Index] = None) -> RetrievalResult:
+        vector_hits = vectorstore.similarity_search_with_relevance_scores(query, k=self.fetch_k)
+        lexical_hits, coverage = lexical_index.search(query, self.fetch_k) if lexical_index else ([], 0.0)
+        if not vector_hits and not lexical_hits:
+            return RetrievalResult()
+
+        documents: Dict[str, Document] = {}
+        vector_scores: Dict[str, float] = {}
+        for doc, score in vector_hits:
+            key = doc.id or doc.page_content
+            documents[key] = doc
+            vector_scores[key] = float(score)
+        floor = min(vector_scores.values(), default=0.0)
+
+        best_lexical = lexical_hits[0][1] if lexical_hits else 0.0
+        lexical_scores = {chunk_id: score / best_lexical for chunk_id, score in lexical_hits}
+        for chunk_id in lexical_scores:
+            if chunk_id not in documents:
+                doc = vectorstore.docstore.search(chunk_id)
+                if isinstance(doc, Document):
+                    documents[chunk_id] = doc
+
+        fused = sorted(
+            ((self.alpha * vector_scores.get(key, floor) + (1 - self.alpha) * lexical_scores.get(key, 0.0), key)
+             for key in documents),
+            reverse=True
+        )
+        ranked = [(score, documents[key]) for score, key in fused]
+
+        if self.reranker is not None and ranked:
+            candidates = [doc for _, doc in ranked[:self.rerank_k]]
+            scores = self.reranker.score(query, [doc.page_content for doc in candidates])
+            ranked = sorted(zip(scores, candidates), key=lambda item: item[0], reverse=True)
+
+        selected = self._select(ranked)
+        return RetrievalResult(
+            documents=[doc for _, doc in selected],
+            scores=[score for score, _ in selected],
+            vector_score=max(vector_scores.values(), default=None),
+            lexical_score=coverage,
+        )
+
+    def _select(self, ranked: List[Tuple[float, Document]]) -> List[Tuple[float, Document]]:
+        """Adaptive k: cut at the first large score gap or once out of the window"""
+        if not ranked:
+            return []
+        top = ranked[0][0]
+        selected = ranked[:self.min_k]
+        for score, doc in ranked[self.min_k:self.max_k]:
+            if score < top - self.window or selected[-1][0] - score > self.gap:
+                break
+            selected.append((score, doc))
+        return selected
@@ -0,0 +1,150 @@
+from typing import Dict, List, Optional, Tuple
+import streamlit as st
+from langchain_community.vectorstores import FAISS
+from langchain_core.vectorstores import VectorStore
+from config.settings import NUMPY_STORE_MAX_VECTORS, NUMPY_STORE_DTYPE
+from utils.document_processor import DocumentProcessor
+from utils.hybrid_retriever import BM25Index, bm25_for_vectorstore
+from utils.index_store import IndexStore
+from utils.numpy_store import NumpyVectorStore
+from utils.telemetry import get_telemetry
+
+
+class IndexManager:
+    """Keep a vector index in sync with a changing set of uploaded files.
+
+    Documents are tracked by content hash, so only files that were added
+    are embedded and only vectors of removed files are deleted. With an
+    IndexStore, finished indexes are persisted by corpus fingerprint and
+    corpora that were indexed before are loaded from disk, shared read-only.
+
+    Corpora of up to `numpy_max_vectors` chunks are held in a
+    NumpyVectorStore; a store that grows past that is converted to FAISS.
+    """
+
+    def __init__(self, doc_processor: DocumentProcessor, index_store: Optional[IndexStore] = None,
+                 numpy_max_vectors: int = NUMPY_STORE_MAX_VECTORS, numpy_dtype: str = NUMPY_STORE_DTYPE):
+        self.doc_processor = doc_processor
+        self.index_store = index_store
+        self.numpy_max_vectors = numpy_max_vectors
+        self.numpy_dtype = numpy_dtype
+        self.vectorstore: Optional[VectorStore] = None
+        # BM25 over the same chunks, for hybrid retrieval
+        self.lexical_index: Optional[BM25Index] = None
+        self.fingerprint: Optional[str] = None
+        # Content hash -> ids of the document's vectors in the store
+        self._doc_ids: Dict[str, List[str]] = {}
+        # Whether self.vectorstore is the store's shared, read-only copy
+        self._shared = False
+
+    @property
+    def document_hashes(self) -> List[str]:
+        return sorted(self._doc_ids)
+
+    def sync(self, uploaded_files) -> Tuple[int, int]:
+        """Bring the index in line with the uploaded files.
+
+        Returns the number of documents added and removed.
+        """
+        current = {}
+        for uploaded_file in uploaded_files or []:
+            current.setdefault(self.doc_processor.file_hash(uploaded_file), uploaded_file)
+
+        removed = [doc_hash for doc_hash in self._doc_ids if doc_hash not in current]
+        added = [doc_hash for doc_hash in current if doc_hash not in self._doc_ids]
+        if not added and not removed:
+            return 0, 0
+
+        fingerprint = IndexStore.fingerprint(current, self.doc_processor.config_key)
+        if self.index_store is not None and self.index_store.has(fingerprint):
+            self._load_shared(fingerprint)
+            return len(added), len(removed)
+
+        if self._shared:
+            self._load_private()
+        for doc_hash in removed:
+            self._remove(doc_hash)
+        for doc_hash in added:
+            self._add(doc_hash, current[doc_hash])
+
+        if not any(self._doc_ids.values()):
+            self.vectorstore = None
+            self.lexical_index = None
+            self.fingerprint = None
+        elif set(self._doc_ids) == set(current):
+            self.fingerprint = fingerprint
+            self._persist()
+        else:
+            # Some documents failed to index; don't persist a partial corpus
+            self.fingerprint = None
+        return len(added), len(removed)
+
+    def _load_shared(self, fingerprint: str) -> None:
+        self.vectorstore = self.index_store.load(
+            fingerprint, self.doc_processor.get_embedding_function()
+        )
+        self.lexical_index = bm25_for_vectorstore(self.vectorstore, shared=True)
+        self._doc_ids = self.index_store.load_manifest(fingerprint)
+        self.fingerprint = fingerprint
+        self._shared = True
+
+    def _load_private(self) -> None:
+        # Copy-on-write: never modify the index other sessions are reading
+        self.vectorstore = self.index_store.load_private(
+            self.fingerprint, self.doc_processor.get_embedding_function()
+        )
+        self.lexical_index = bm25_for_vectorstore(self.vectorstore)
+        self._shared = False
+
+    def _persist(self) -> None:
+        if self.index_store is None:
+            return
+        try:
+            self.index_store.save(self.fingerprint, self.vectorstore, self._doc_ids)
+        except Exception as e:
+            st.warning(f"Could not persist document index: {str(e)}")
+            return
+        # Swap the private copy for the shared memory-mapped one
+        self._load_shared(self.fingerprint)
+
+    def _add(self, doc_hash: str, uploaded_file) -> None:
+        chunked = self.doc_processor.chunk_file(uploaded_file, doc_hash)
+        chunks = [chunk.text for chunk in chunked]
+        ids = [f"{doc_hash}:{i}" for i in range(len(chunks))]
+        metadatas = [chunk.metadata(doc_hash, uploaded_file.name) for chunk in chunked]
+
+        if chunks:
+            try:
+                with get_telemetry().span("ingest.index"):
+                    if self.vectorstore is None:
+                        self.vectorstore = self._create_store(chunks, metadatas, ids)
+                    else:
+                        self.vectorstore.add_texts(chunks, metadatas=metadatas, ids=ids)
+                        if (isinstance(self.vectorstore, NumpyVectorStore)
+                                and len(self.vectorstore) > self.numpy_max_vectors):
+                            self.vectorstore = self.vectorstore.to_faiss()
+                get_telemetry().count("ingest_chunks_total", len(chunks))
+                if self.lexical_index is None:
+                    self.lexical_index = BM25Index()
+                for chunk_id, chunk in zip(ids, chunks):
+                    self.lexical_index.add(chunk_id, chunk)
+            except Exception as e:
+                st.error(f"Error indexing {uploaded_file.name}: {str(e)}")
+                return
+
+        # Empty documents are recorded too so they are not re-parsed
+        self._doc_ids[doc_hash] = ids
+
+    def _create_store(self, chunks: List[str], metadatas: List[dict], ids: List[str]) -> VectorStore:
+        embeddings = self.doc_processor.get_embedding_function()
+        if len(chunks) <= self.numpy_max_vectors:
+            return NumpyVectorStore.from_texts(chunks, embeddings, metadatas=metadatas, ids=ids, dtype=self.numpy_dtype)
+        return FAISS.from_texts(chunks, embeddings, metadatas=metadatas, ids=ids)
+
+    def _remove(self, doc_hash: str) -> None:
+        ids = self._doc_ids.pop(doc_hash)
+        if ids and self.vectorstore is not None:
+            self.vectorstore.delete(ids)
+        if self.lexical_index is not None:
+            for chunk_id in ids:
+                self.lexical_index.remove(chunk_id)
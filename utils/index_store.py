@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from utils.numpy_store import NumpyVectorStore
+
+
+class IndexStore:
+    """On-disk vector index store (FAISS or NumPy) keyed by corpus fingerprint.
+
+    Each corpus is saved once; later loads memory-map the index read-only
+    and share the loaded object within the process, so sessions (and worker
+    processes) indexing the same documents share pages instead of each
+    holding and embedding their own copy. Flat FAISS indexes are only
+    mapped by faiss builds with IO_FLAG_MMAP_IFC; older ones read them
+    into memory.
+    """
+
+    INDEX_FILE = "index.faiss"
+    DOCSTORE_FILE = "index.pkl"
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, root: str, max_loaded: int = 32):
+        self.root = root
+        self.max_loaded = max_loaded
+        self._loaded: "OrderedDict[str, VectorStore]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(doc_hashes: Iterable[str], config_key: str) -> str:
+        """Fingerprint a corpus from its document hashes and indexing config"""
+        digest = hashlib.sha256(config_key.encode("utf-8"))
+        for doc_hash in sorted(set(doc_hashes)):
+            digest.update(b"\0")
+            digest.update(doc_hash.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.root, fingerprint)
+
+    def has(self, fingerprint: str) -> bool:
+        return os.path.exists(os.path.join(self._path(fingerprint), self.MANIFEST_FILE))
+
+    def save(self, fingerprint: str, vectorstore: VectorStore, doc_ids: Dict[str, List[str]]) -> None:
+        """Persist an index, its docstore and the document -> ids manifest"""
+        if self.has(fingerprint):
+            return
+
+        tmp_path = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_path)
+        try:
+            if isinstance(vectorstore, NumpyVectorStore):
+                vectorstore.save(tmp_path)
+            else:
+                import faiss
+                faiss.write_index(vectorstore.index, os.path.join(tmp_path, self.INDEX_FILE))
+                with open(os.path.join(tmp_path, self.DOCSTORE_FILE), "wb") as f:
+                    pickle.dump((vectorstore.docstore, vectorstore.index_to_docstore_id), f)
+            # The manifest is written last; its presence marks a complete entry
+            with open(os.path.join(tmp_path, self.MANIFEST_FILE), "w") as f:
+                json.dump({"doc_ids": doc_ids}, f)
+            os.rename(tmp_path, self._path(fingerprint))
+        except OSError:
+            # Another process saved the same corpus first
+            if not self.has(fingerprint):
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def load_manifest(self, fingerprint: str) -> Dict[str, List[str]]:
+        with open(os.path.join(self._path(fingerprint), self.MANIFEST_FILE)) as f:
+            return json.load(f)["doc_ids"]
+
+    def load(self, fingerprint: str, embeddings: Embeddings) -> VectorStore:
+        """Return the shared, read-only store for a corpus.
+
+        The returned object is shared with other sessions and must not be
+        modified; use load_private() for a writable copy.
+        """
+        with self._lock:
+            vectorstore = self._loaded.get(fingerprint)
+            if vectorstore is not None:
+                self._loaded.move_to_end(fingerprint)
+                return vectorstore
+
+        vectorstore = self._read(fingerprint, embeddings, mmap=True)
+        with self._lock:
+            vectorstore = self._loaded.setdefault(fingerprint, vectorstore)
+            self._loaded.move_to_end(fingerprint)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return vectorstore
+
+    def load_private(self, fingerprint: str, embeddings: Embeddings) -> VectorStore:
+        """Return a writable in-memory copy of a stored corpus"""
+        return self._read(fingerprint, embeddings, mmap=False)
+
+    def _read(self, fingerprint: str, embeddings: Embeddings, mmap: bool) -> VectorStore:
+        path = self._path(fingerprint)
+        if NumpyVectorStore.exists(path):
+            return NumpyVectorStore.load(path, embeddings, mmap=mmap)
+
+        # Only FAISS-backed corpora need the library
+        import faiss
+        index_path = os.path.join(path, self.INDEX_FILE)
+        index = None
+        if mmap:
+            # IO_FLAG_MMAP alone maps only IVF inverted lists and reads an
+            # IndexFlat into memory; IO_FLAG_MMAP_IFC (newer faiss) maps its
+            # vectors too
+            flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+            try:
+                index = faiss.read_index(index_path, flag | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                # Index types without mmap support are read into memory
+                index = None
+        if index is None:
+            index = faiss.read_index(index_path)
+
+        with open(os.path.join(path, self.DOCSTORE_FILE), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        return FAISS(embeddings, index, docstore, index_to_docstore_id)
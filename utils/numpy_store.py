@@ -0,0 +1,241 @@
+import os
+import pickle
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+# Rows converted to float32 at a time when scoring float16/int8 matrices;
+# small enough for the converted block to stay in cache
+SCORE_BLOCK_ROWS = 256
+
+
+class NumpyVectorStore(VectorStore):
+    """Exact vector search over one contiguous NumPy matrix.
+
+    A small corpus (a few documents, a few hundred chunks) does not need an
+    ANN library: a single matrix product scores every chunk in well under a
+    millisecond. Vectors are kept as float32, float16 or int8 with a scale
+    per row, the latter two halving or quartering memory (float16 scores
+    slowest, as NumPy converts half floats without SIMD). Distances and
+    relevance scores match LangChain's default FAISS store (squared L2,
+    `1 - d / sqrt(2)`), so the two are interchangeable; `to_faiss` converts
+    a store that grew too large without embedding anything again.
+    """
+
+    MATRIX_FILE = "vectors.npy"
+    DATA_FILE = "vectors.pkl"
+
+    def __init__(self, embedding: Embeddings, dimensions: int, dtype: str = "float32"):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype {dtype!r}; use one of {', '.join(DTYPES)}")
+        self.embedding = embedding
+        self.dtype = dtype
+        self.docstore = InMemoryDocstore()
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        # Rows beyond len(self) are spare capacity for appends
+        self._matrix = np.empty((0, dimensions), dtype=DTYPES[dtype])
+        self._norms = np.empty(0, dtype=np.float32)
+        self._scales = np.empty(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @property
+    def dimensions(self) -> int:
+        return self._matrix.shape[1]
+
+    @property
+    def index_to_docstore_id(self) -> Dict[int, str]:
+        return dict(enumerate(self._ids))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the vectors, norms and scales"""
+        n = len(self)
+        return self._matrix[:n].nbytes + self._norms[:n].nbytes + (self._scales[:n].nbytes if self.dtype == "int8" else 0)
+
+    def vectors(self) -> np.ndarray:
+        """The stored vectors as float32 (dequantized for float16/int8)"""
+        n = len(self)
+        vectors = self._matrix[:n].astype(np.float32)
+        if self.dtype == "int8":
+            vectors *= self._scales[:n, None]
+        return vectors
+
+    def add_embeddings(self, texts: Sequence[str], embeddings: Sequence[Sequence[float]],
+                       metadatas: Optional[Sequence[dict]] = None, ids: Optional[Sequence[str]] = None) -> List[str]:
+        ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in texts]
+        duplicates = [chunk_id for chunk_id in ids if chunk_id in self._positions]
+        if duplicates or len(set(ids)) != len(ids):
+            raise ValueError(f"Tried to add ids that already exist: {duplicates or ids}")
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+
+        n = len(self)
+        self._reserve(n + len(ids))
+        self._norms[n:n + len(ids)] = np.einsum("ij,ij->i", vectors, vectors)
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127
+            scales[scales == 0] = 1.0
+            self._scales[n:n + len(ids)] = scales
+            self._matrix[n:n + len(ids)] = np.rint(vectors / scales[:, None])
+        else:
+            self._matrix[n:n + len(ids)] = vectors
+
+        metadatas = metadatas or [{} for _ in texts]
+        self.docstore.add({
+            chunk_id: Document(id=chunk_id, page_content=text, metadata=dict(metadata))
+            for chunk_id, text, metadata in zip(ids, texts, metadatas)
+        })
+        for chunk_id in ids:
+            self._positions[chunk_id] = len(self._ids)
+            self._ids.append(chunk_id)
+        return ids
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._matrix):
+            return
+        # Grow geometrically so appends stay amortized O(1)
+        capacity = max(size, 2 * len(self._matrix), 64)
+        n = len(self)
+        for name in ("_matrix", "_norms", "_scales"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:n] = old[:n]
+            setattr(self, name, new)
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        return self.add_embeddings(texts, self.embedding.embed_documents(texts), metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if ids is None:
+            raise ValueError("No ids provided to delete.")
+        missing = [chunk_id for chunk_id in ids if chunk_id not in self._positions]
+        if missing:
+            raise ValueError(f"Some specified ids do not exist in the current store. Ids not found: {missing}")
+
+        n = len(self)
+        keep = np.ones(n, dtype=bool)
+        keep[[self._positions[chunk_id] for chunk_id in ids]] = False
+        self._matrix = self._matrix[:n][keep]
+        self._norms = self._norms[:n][keep]
+        self._scales = self._scales[:n][keep]
+        self.docstore.delete(ids)
+        self._ids = [chunk_id for chunk_id, kept in zip(self._ids, keep) if kept]
+        self._positions = {chunk_id: i for i, chunk_id in enumerate(self._ids)}
+        return True
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        return [self.docstore.search(chunk_id) for chunk_id in ids if chunk_id in self._positions]
+
+    def search_vectors(self, queries: np.ndarray, k: int = 4) -> List[List[Tuple[int, float]]]:
+        """Top-k (row, squared L2 distance) pairs for each row of `queries`, in one matrix product"""
+        n = len(self)
+        if n == 0:
+            return [[] for _ in range(len(queries))]
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dimensions)
+
+        if self.dtype == "float32":
+            dots = queries @ self._matrix[:n].T
+        else:
+            dots = np.empty((len(queries), n), dtype=np.float32)
+            for start in range(0, n, SCORE_BLOCK_ROWS):
+                stop = min(start + SCORE_BLOCK_ROWS, n)
+                dots[:, start:stop] = queries @ self._matrix[start:stop].astype(np.float32).T
+            if self.dtype == "int8":
+                dots *= self._scales[:n]
+        distances = self._norms[:n] - 2 * dots + np.einsum("ij,ij->i", queries, queries)[:, None]
+
+        k = min(k, n)
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k] if k < n else np.tile(np.arange(n), (len(queries), 1))
+        results = []
+        for row, candidates in zip(distances, top):
+            order = candidates[np.argsort(row[candidates], kind="stable")]
+            results.append([(int(i), float(max(row[i], 0.0))) for i in order])
+        return results
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4,
+                                               **kwargs: Any) -> List[Tuple[Document, float]]:
+        return [(self.docstore.search(self._ids[i]), distance)
+                for i, distance in self.search_vectors(np.asarray([embedding]), k)[0]]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    @classmethod
+    def from_embeddings(cls, text_embeddings: Sequence[Tuple[str, Sequence[float]]], embedding: Embeddings,
+                        metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None,
+                        dtype: str = "float32") -> "NumpyVectorStore":
+        texts = [text for text, _ in text_embeddings]
+        vectors = [vector for _, vector in text_embeddings]
+        store = cls(embedding, len(vectors[0]) if vectors else 0, dtype)
+        store.add_embeddings(texts, vectors, metadatas, ids)
+        return store
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, dtype: str = "float32", **kwargs: Any) -> "NumpyVectorStore":
+        return cls.from_embeddings(list(zip(texts, embedding.embed_documents(texts))), embedding, metadatas, ids, dtype)
+
+    def to_faiss(self):
+        """An equivalent LangChain FAISS store (IndexFlatL2) over the same vectors"""
+        import faiss
+        from langchain_community.vectorstores import FAISS
+
+        index = faiss.IndexFlatL2(self.dimensions)
+        index.add(self.vectors())
+        docstore = InMemoryDocstore({chunk_id: self.docstore.search(chunk_id) for chunk_id in self._ids})
+        return FAISS(self.embedding, index, docstore, self.index_to_docstore_id)
+
+    def save(self, path: str) -> None:
+        n = len(self)
+        np.save(os.path.join(path, self.MATRIX_FILE), self._matrix[:n])
+        with open(os.path.join(path, self.DATA_FILE), "wb") as f:
+            pickle.dump({
+                "dtype": self.dtype,
+                "ids": self._ids,
+                "documents": [self.docstore.search(chunk_id) for chunk_id in self._ids],
+                "norms": self._norms[:n],
+                "scales": self._scales[:n],
+            }, f)
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        return os.path.exists(os.path.join(path, cls.MATRIX_FILE))
+
+    @classmethod
+    def load(cls, path: str, embedding: Embeddings, mmap: bool = False) -> "NumpyVectorStore":
+        """Read a saved store; with `mmap` the matrix is a read-only memory map"""
+        matrix = np.load(os.path.join(path, cls.MATRIX_FILE), mmap_mode="r" if mmap else None)
+        with open(os.path.join(path, cls.DATA_FILE), "rb") as f:
+            data = pickle.load(f)
+        store = cls(embedding, matrix.shape[1], data["dtype"])
+        store._matrix = matrix
+        store._norms = data["norms"]
+        store._scales = data["scales"]
+        store._ids = data["ids"]
+        store._positions = {chunk_id: i for i, chunk_id in enumerate(store._ids)}
+        store.docstore.add(dict(zip(store._ids, data["documents"])))
+        return store
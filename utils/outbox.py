@@ -0,0 +1,282 @@
+import hashlib
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Callable, List, Optional, Tuple
+from utils.emailer import send_confirmation_emails
+from utils.sheets import get_sheets_writer
+from utils.telemetry import get_telemetry
+
+logger = logging.getLogger(__name__)
+
+
+class BookingOutbox:
+    """Durable SQLite outbox for booking side effects.
+
+    Bookings are recorded locally and the chat turn returns right away;
+    background workers then append them to Google Sheets and send the
+    confirmation email, retrying failures with exponential backoff. Each
+    step is tracked separately, so a booking whose sheet write succeeded
+    but whose email failed only retries the email. The booking ID is derived
+    from the booking details and doubles as the idempotency key: submitting
+    the same booking twice yields the same ID and a single set of effects.
+    Resubmitting a booking that ran out of attempts queues it again, keeping
+    the steps that already succeeded.
+    """
+
+    ENQUEUE_SQL = (
+        "INSERT INTO bookings"
+        " (id, name, phone, email, appointment_date, next_attempt, created)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT(id) DO UPDATE SET"
+        " status = 'pending', attempts = 0, next_attempt = excluded.next_attempt, last_error = NULL"
+        " WHERE bookings.status = 'failed'"
+    )
+
+    def __init__(self, path: str,
+                 append_rows: Callable[[List[list]], None],
+                 send_emails: Callable[[List[tuple]], List[Optional[Exception]]],
+                 workers: int = 1, batch_size: int = 20,
+                 max_attempts: int = 8, backoff: float = 2.0,
+                 lease: float = 60.0, poll_interval: float = 1.0):
+        self.path = path
+        self.append_rows = append_rows
+        self.send_emails = send_emails
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bookings ("
+                " id TEXT PRIMARY KEY,"
+                " name TEXT NOT NULL,"
+                " phone TEXT NOT NULL,"
+                " email TEXT NOT NULL,"
+                " appointment_date TEXT NOT NULL,"
+                " status TEXT NOT NULL DEFAULT 'pending',"
+                " sheet_done INTEGER NOT NULL DEFAULT 0,"
+                " email_done INTEGER NOT NULL DEFAULT 0,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt REAL NOT NULL,"
+                " last_error TEXT,"
+                " created REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS bookings_due ON bookings (status, next_attempt)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def booking_id(name: str, phone: str, email: str, appointment_date: str) -> str:
+        """Deterministic booking ID used as the idempotency key"""
+        key = "\0".join(part.strip().lower() for part in (name, phone, email, appointment_date))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:10].upper()
+
+    def enqueue(self, name: str, phone: str, email: str, appointment_date: str) -> str:
+        """Record a booking for background processing and return its ID"""
+        booking_id = self.booking_id(name, phone, email, appointment_date)
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(self.ENQUEUE_SQL, (booking_id, name, phone, email, appointment_date, now, now))
+        self._wakeup.set()
+        return booking_id
+
+    def enqueue_many(self, bookings: List[tuple]) -> List[Tuple[str, str]]:
+        """Record (name, phone, email, appointment_date) bookings in one transaction
+
+        Returns each booking's ID and its status once recorded: "pending"
+        for new and requeued bookings, "done" for ones already processed.
+        """
+        now = time.time()
+        ids = [self.booking_id(*booking) for booking in bookings]
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                self.ENQUEUE_SQL,
+                [(booking_id, *booking, now, now) for booking_id, booking in zip(ids, bookings)],
+            )
+            # Read back inside the transaction, before a worker can pick them up
+            statuses = [conn.execute("SELECT status FROM bookings WHERE id = ?", (booking_id,)).fetchone()[0]
+                        for booking_id in ids]
+            conn.execute("COMMIT")
+        self._wakeup.set()
+        return list(zip(ids, statuses))
+
+    def status(self, booking_id: str) -> Optional[dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM bookings WHERE id = ?", (booking_id,)).fetchone()
+        return dict(row) if row else None
+
+    def stats(self) -> dict:
+        """Return the number of bookings per status"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM bookings GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def start(self) -> None:
+        """Start the background workers (idempotent)"""
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        if self._threads:
+            if self._stop.is_set():
+                logger.warning("Booking outbox workers are still stopping; not starting new ones")
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"booking-outbox-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background workers; ones still busy after `timeout` stop when done"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        # Workers still running keep seeing the stop flag; start() clears it
+        # only once they have exited
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        if self._threads:
+            logger.warning("%d booking outbox worker(s) still running after stop", len(self._threads))
+
+    def drain(self) -> int:
+        """Process due bookings until none are left; returns how many were handled"""
+        handled = 0
+        while True:
+            rows = self._claim()
+            if not rows:
+                return handled
+            self._process(rows)
+            handled += len(rows)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.drain():
+                    continue
+            except Exception:
+                logger.exception("Booking outbox worker failed")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _claim(self) -> List[sqlite3.Row]:
+        # Lease due rows so other workers (and processes) skip them meanwhile
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT * FROM bookings WHERE status = 'pending' AND next_attempt <= ?"
+                " ORDER BY next_attempt LIMIT ?",
+                (now, self.batch_size),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE bookings SET next_attempt = ? WHERE id = ?",
+                [(now + self.lease, row["id"]) for row in rows],
+            )
+            conn.execute("COMMIT")
+        return rows
+
+    def _process(self, rows: List[sqlite3.Row]) -> None:
+        errors = {}
+
+        # One append call for every booking still missing from the sheet
+        sheet_rows = [row for row in rows if not row["sheet_done"]]
+        if sheet_rows:
+            try:
+                self.append_rows([
+                    [row["name"], row["phone"], row["email"], row["appointment_date"], row["id"]]
+                    for row in sheet_rows
+                ])
+                self._mark(sheet_rows, "sheet_done")
+            except Exception as e:
+                errors.update({row["id"]: f"sheet: {e}" for row in sheet_rows})
+
+        # Emails for the batch go out over one pooled connection
+        email_rows = [row for row in rows if not row["email_done"] and row["id"] not in errors]
+        if email_rows:
+            try:
+                results = self.send_emails([
+                    (row["email"], row["name"], row["appointment_date"], row["id"])
+                    for row in email_rows
+                ])
+            except Exception as e:
+                results = [e] * len(email_rows)
+            for row, error in zip(email_rows, results):
+                if error is not None:
+                    errors[row["id"]] = f"email: {error}"
+            self._mark([row for row, error in zip(email_rows, results) if error is None], "email_done")
+
+        self._finish(rows, errors)
+
+    def _mark(self, rows: List[sqlite3.Row], column: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                f"UPDATE bookings SET {column} = 1 WHERE id = ?",
+                [(row["id"],) for row in rows],
+            )
+
+    def _finish(self, rows: List[sqlite3.Row], errors: dict) -> None:
+        now = time.time()
+        telemetry = get_telemetry()
+        with closing(self._connect()) as conn:
+            for row in rows:
+                telemetry.count("bookings_processed_total", result="failed" if row["id"] in errors else "done")
+                if row["id"] not in errors:
+                    conn.execute("UPDATE bookings SET status = 'done', last_error = NULL WHERE id = ?", (row["id"],))
+                    continue
+
+                attempts = row["attempts"] + 1
+                status = "failed" if attempts >= self.max_attempts else "pending"
+                delay = self.backoff * 2 ** (attempts - 1) * (0.5 + random.random())
+                conn.execute(
+                    "UPDATE bookings SET status = ?, attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                    (status, attempts, now + delay, errors[row["id"]], row["id"]),
+                )
+                logger.warning("Booking %s attempt %d failed: %s", row["id"], attempts, errors[row["id"]])
+
+
+_outbox: Optional[BookingOutbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_booking_outbox() -> BookingOutbox:
+    """Return the process-wide booking outbox, starting its workers"""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = BookingOutbox(
+                os.getenv("OUTBOX_PATH", ".cache/outbox.sqlite3"),
+                append_rows=get_sheets_writer().append_rows,
+                send_emails=send_confirmation_emails,
+                workers=int(os.getenv("OUTBOX_WORKERS", 1)),
+            )
+            _outbox.start()
+        return _outbox
+
+
+def set_booking_outbox(outbox: BookingOutbox) -> None:
+    """Replace the process-wide booking outbox (e.g. with one over fakes)"""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is not None and _outbox is not outbox:
+            _outbox.stop()
+        _outbox = outbox
+        _outbox.start()
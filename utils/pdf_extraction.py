@@ -0,0 +1,19 @@
+"""PDF page extraction run inside worker processes.
+
+Kept free of Streamlit and LangChain imports so spawned workers start fast.
+"""
+from typing import List
+import PyPDF2
+
+# Workers handle many page ranges of the same file; keep its reader open
+_reader_path = None
+_reader = None
+
+
+def extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) of the PDF at path"""
+    global _reader_path, _reader
+    if _reader_path != path:
+        _reader = PyPDF2.PdfReader(path)
+        _reader_path = path
+    return [_reader.pages[i].extract_text() or "" for i in range(start, stop)]
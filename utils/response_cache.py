@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+
+@dataclass
+class _Entry:
+    namespace: str
+    vector: np.ndarray
+    answer: str
+    created: float
+    latency: float
+
+
+class SemanticResponseCache:
+    """In-memory cache of chatbot answers keyed by corpus and query meaning.
+
+    Answers are stored per namespace (the corpus fingerprint) together with
+    the normalized query embedding. A lookup returns the answer of the most
+    similar stored query when its cosine similarity passes the threshold.
+    Entries expire after `ttl` seconds and the least recently used entries
+    are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl: float = 3600, max_entries: int = 1000):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def lookup(self, namespace: str, query_vector: List[float]) -> Optional[str]:
+        """Return a cached answer for a similar query, or None"""
+        started = time.perf_counter()
+        query = self._normalize(query_vector)
+        now = time.time()
+
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if now - entry.created > self.ttl]
+            for key in expired:
+                del self._entries[key]
+
+            keys = [key for key, entry in self._entries.items() if entry.namespace == namespace]
+            best_key = None
+            if keys:
+                matrix = np.stack([self._entries[key].vector for key in keys])
+                similarities = matrix @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    best_key = keys[best]
+
+            if best_key is None:
+                self.misses += 1
+                return None
+
+            entry = self._entries[best_key]
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            self.saved_seconds += max(entry.latency - (time.perf_counter() - started), 0.0)
+            return entry.answer
+
+    def store(self, namespace: str, query_vector: List[float], answer: str, latency: float) -> None:
+        """Cache an answer along with how long it took to produce"""
+        entry = _Entry(namespace, self._normalize(query_vector), answer, time.time(), latency)
+        with self._lock:
+            self._entries[self._next_id] = entry
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Return hit rate and latency saved by cache hits"""
+        with self._lock:
+            hits, misses, saved = self.hits, self.misses, self.saved_seconds
+            size = len(self._entries)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "saved_seconds": saved,
+            "entries": size,
+        }
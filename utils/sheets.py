@@ -1,40 +1,152 @@
 import os, json, base64
-from oauth2client.service_account import ServiceAccountCredentials
-import gspread
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+from utils.telemetry import get_telemetry
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def append_to_google_sheet(name, phone, email, appointment_date):
- 
-    # 1) Decode Base64 JSON creds
+SCOPE = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive"
+]
+
+
+def get_sheet_name() -> str:
+    sheet_name = os.getenv("GOOGLE_SHEET_NAME")
+    if not sheet_name:
+        raise RuntimeError("Missing GOOGLE_SHEET_NAME in .env")
+    return sheet_name
+
+
+def authorize_client():
+    """Build an authorized gspread client from the base64 service account creds"""
+    # Imported on first use: gspread and oauth2client take ~0.3s to import
+    from oauth2client.service_account import ServiceAccountCredentials
+    import gspread
+
     raw_b64 = os.getenv("GOOGLE_CREDENTIALS_BASE64")
     if not raw_b64:
         raise RuntimeError("Missing GOOGLE_CREDENTIALS_BASE64 in .env")
     try:
         json_str = base64.b64decode(raw_b64).decode("utf-8")
         creds_dict = json.loads(json_str)
-        
     except Exception as e:
         print(f"ERROR decoding/parsing credentials: {e}")
         raise
 
-    # 2) Sheet name
-    sheet_name = os.getenv("GOOGLE_SHEET_NAME")
-    if not sheet_name:
-        raise RuntimeError("Missing GOOGLE_SHEET_NAME in .env")
-    
-
-    # 3) Authorize
-    scope = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive"
-    ]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    client = gspread.authorize(creds)
-    
-
-    # 4) Append
-    sheet = client.open(sheet_name).sheet1
-    sheet.append_row([name, phone, email, appointment_date])
-    
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPE)
+    # The client's session refreshes the access token only once it expires
+    return gspread.authorize(creds)
+
+
+class SheetsWriter:
+    """Long-lived, thread-safe writer that appends rows to a Google Sheet.
+
+    The authorized client and worksheet handle are created once and reused.
+    Rows appended concurrently are coalesced: the first caller waits
+    `linger` seconds for others to join, then writes the whole batch with a
+    single append_rows call while the rest wait for its result.
+    """
+
+    def __init__(self, sheet_name: Optional[str] = None,
+                 client_factory: Callable = authorize_client,
+                 linger: float = 0.05, max_batch: int = 100):
+        self.sheet_name = sheet_name
+        self.client_factory = client_factory
+        self.linger = linger
+        self.max_batch = max_batch
+        self.rows_written = 0
+        self.api_calls = 0
+        self._worksheet = None
+        self._worksheet_lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._flushing = False
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def append_row(self, row: list) -> None:
+        """Append one row, blocking until the batch containing it is written"""
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((row, future))
+            leader = not self._flushing
+            self._flushing = True
+
+        if leader:
+            if self.linger:
+                time.sleep(self.linger)
+            self._flush()
+        future.result()
+
+    def append_rows(self, rows: List[list]) -> None:
+        """Append several rows in one API call"""
+        self._write(rows)
+
+    def reset(self) -> None:
+        """Drop the cached client and worksheet handle"""
+        with self._worksheet_lock:
+            self._worksheet = None
+
+    def _flush(self) -> None:
+        while True:
+            with self._lock:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                if not batch:
+                    self._flushing = False
+                    return
+            try:
+                self._write([row for row, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for _, future in batch:
+                    future.set_result(None)
+
+    def _get_worksheet(self):
+        with self._worksheet_lock:
+            if self._worksheet is None:
+                client = self.client_factory()
+                self._worksheet = client.open(self.sheet_name or get_sheet_name()).sheet1
+            return self._worksheet
+
+    def _write(self, rows: List[list]) -> None:
+        from gspread.exceptions import APIError
+        telemetry = get_telemetry()
+        calls = 1
+        with telemetry.span("sheets.append"):
+            try:
+                self._get_worksheet().append_rows(rows)
+            except APIError as e:
+                # Revoked credentials or a replaced sheet: reconnect once
+                if e.code not in (401, 404):
+                    raise
+                self.reset()
+                self._get_worksheet().append_rows(rows)
+                calls += 1
+        # append_rows and the outbox workers may write concurrently
+        with self._stats_lock:
+            self.api_calls += calls
+            self.rows_written += len(rows)
+        telemetry.count("sheets_rows_total", len(rows))
+
+
+_writer: Optional[SheetsWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_sheets_writer() -> SheetsWriter:
+    """Return the process-wide Sheets writer"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SheetsWriter(linger=float(os.getenv("SHEETS_BATCH_LINGER", 0.05)))
+        return _writer
+
+
+def append_to_google_sheet(name, phone, email, appointment_date):
+    get_sheets_writer().append_row([name, phone, email, appointment_date])
@@ -0,0 +1,240 @@
+"""Per-stage timing, counters and tracing for the request path.
+
+Stages are timed with `span` (or the `traced` decorator) into latency
+histograms that render in the Prometheus text format. Spans nest, so a
+parent stage's time includes its children's. With TELEMETRY_OPENTELEMETRY=1
+and the OpenTelemetry API installed, every span is also reported to the
+configured tracer.
+
+Recording a span costs two perf_counter calls, a bisect and a short lock
+(a few microseconds), so it is cheap enough for every request.
+"""
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # optional dependency
+    otel_trace = None
+
+T = TypeVar("T")
+
+# Seconds; covers local regex paths up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile"""
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Span:
+    """Context manager timing one stage (see Telemetry.span)"""
+
+    __slots__ = ("telemetry", "stage", "labels", "started", "otel_span")
+
+    def __init__(self, telemetry: "Telemetry", stage: str, labels: Dict[str, str]):
+        self.telemetry = telemetry
+        self.stage = stage
+        self.labels = labels
+        self.otel_span = None
+
+    def __enter__(self) -> "Span":
+        tracer = self.telemetry._tracer
+        if tracer is not None:
+            self.otel_span = tracer.start_as_current_span(self.stage, attributes=self.labels)
+            self.otel_span.__enter__()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.telemetry.observe(self.stage, time.perf_counter() - self.started, **self.labels)
+        if exc_type is not None:
+            self.telemetry.count("errors_total", stage=self.stage)
+        if self.otel_span is not None:
+            self.otel_span.__exit__(exc_type, exc, tb)
+
+
+class Telemetry:
+    """Registry of stage histograms, counters and watched caches"""
+
+    def __init__(self, namespace: str = "chatbot", buckets=DEFAULT_BUCKETS, opentelemetry: bool = False):
+        self.namespace = namespace
+        self.buckets = buckets
+        self._histograms: Dict[Labels, Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._caches: Dict[str, Callable[[], dict]] = {}
+        self._lock = threading.Lock()
+        self._tracer = otel_trace.get_tracer(namespace) if opentelemetry and otel_trace else None
+
+    def observe(self, stage: str, seconds: float, **labels) -> None:
+        key = _labels({"stage": stage, **labels})
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def watch_cache(self, name: str, stats: Callable[[], dict]) -> None:
+        """Report a cache's hits, misses and hit rate, read from `stats()` when rendered"""
+        with self._lock:
+            self._caches[name] = stats
+
+    def span(self, stage: str, **labels) -> "Span":
+        """Time a stage; errors are counted and re-raised"""
+        return Span(self, stage, labels)
+
+    def traced(self, stage: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        """Decorator form of span"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def timed_iter(self, stage: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Yield from `iterable`, recording only the time spent producing items"""
+        iterator = iter(iterable)
+        elapsed = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - started
+                    return
+                elapsed += time.perf_counter() - started
+                yield item
+        finally:
+            self.observe(stage, elapsed)
+
+    def stage_summary(self) -> List[dict]:
+        """Count, mean and approximate p50/p95/p99 per stage"""
+        with self._lock:
+            items = [(dict(labels), histogram) for labels, histogram in self._histograms.items()]
+        return [
+            {
+                **labels,
+                "count": histogram.count,
+                "mean_ms": histogram.sum / histogram.count * 1000 if histogram.count else 0.0,
+                "p50_ms": histogram.quantile(0.5) * 1000,
+                "p95_ms": histogram.quantile(0.95) * 1000,
+                "p99_ms": histogram.quantile(0.99) * 1000,
+            }
+            for labels, histogram in sorted(items, key=lambda item: sorted(item[0].items()))
+        ]
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        prefix = self.namespace
+        with self._lock:
+            histograms = [(labels, histogram.counts[:], histogram.count, histogram.sum)
+                          for labels, histogram in sorted(self._histograms.items())]
+            counters = sorted(self._counters.items())
+            caches = sorted(self._caches.items())
+
+        lines = [f"# TYPE {prefix}_stage_seconds histogram"]
+        for labels, counts, count, total in histograms:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % bound
+                lines.append(f"{prefix}_stage_seconds_bucket{_format_labels(labels, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{prefix}_stage_seconds_bucket{_format_labels(labels, le)} {count}")
+            lines.append(f"{prefix}_stage_seconds_sum{_format_labels(labels)} {total}")
+            lines.append(f"{prefix}_stage_seconds_count{_format_labels(labels)} {count}")
+
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                typed.add(name)
+            lines.append(f"{prefix}_{name}{_format_labels(labels)} {value}")
+
+        cache_stats = []
+        for name, stats in caches:
+            try:
+                cache_stats.append((_labels({"cache": name}), stats()))
+            except Exception:
+                continue
+        for field, metric, kind in (("hits", "cache_hits_total", "counter"),
+                                    ("misses", "cache_misses_total", "counter"),
+                                    ("hit_rate", "cache_hit_rate", "gauge")):
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for labels, values in cache_stats:
+                lines.append(f"{prefix}_{metric}{_format_labels(labels)} {values.get(field, 0)}")
+        return "\n".join(lines) + "\n"
+
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """Count LLM calls and the tokens they report"""
+
+    def __init__(self, telemetry: Telemetry):
+        self.telemetry = telemetry
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        self.telemetry.count("llm_calls_total")
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self.telemetry.count("llm_tokens_total", usage.get("input_tokens", 0), kind="input")
+                    self.telemetry.count("llm_tokens_total", usage.get("output_tokens", 0), kind="output")
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """Return the process-wide telemetry registry"""
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry(opentelemetry=os.getenv("TELEMETRY_OPENTELEMETRY", "").lower() in ("1", "true"))
+        return _telemetry
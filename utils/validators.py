@@ -1,14 +1,116 @@
 import re
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple, Union
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# +9779XXXXXXXXX, 9XXXXXXXXX or 09XXXXXXXXX, second digit 6, 7 or 8
+PHONE_PATTERN = re.compile(r"^(?:\+977|0)?9[6-8]\d{8}$")
+PHONE_STRIP_PATTERN = re.compile(r"[^\d+]")
+
+MONTHS = {
+    'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4, 'may': 5, 'june': 6, 'jun': 6,
+    'july': 7, 'jul': 7, 'august': 8, 'aug': 8, 'september': 9, 'sept': 9, 'sep': 9,
+    'october': 10, 'oct': 10, 'november': 11, 'nov': 11, 'december': 12, 'dec': 12
+}
+
+WEEKDAYS = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6
+}
+
+NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10
+}
+
+UNIT_DAYS = {'day': 1, 'week': 7}
+
+
+def _alternation(words) -> str:
+    # Longest first so "september" wins over "sep"
+    return "|".join(sorted(words, key=len, reverse=True))
+
+
+_MONTH = _alternation(MONTHS)
+_WEEKDAY = _alternation(WEEKDAYS)
+_NUMBER = r"\d{1,3}|" + _alternation(NUMBER_WORDS)
+_ORDINAL = r"(?:st|nd|rd|th)?"
+
+# One alternation per kind of date expression, scanned in a single pass.
+# "day after tomorrow" must come before "tomorrow" to match at "day".
+DATE_PATTERN = re.compile("|".join([
+    r"(?P<today>\btoday\b)",
+    r"(?P<overmorrow>\bday\s+after\s+tomorrow\b)",
+    r"(?P<tomorrow>\b(?:tomorrow|tmrw|tmr)\b)",
+    rf"(?P<relative>\b(?:in|after)\s+(?P<rel_n>{_NUMBER})\s+(?P<rel_unit>day|week)s?\b)",
+    rf"(?P<relative_from_now>\b(?P<rfn_n>{_NUMBER})\s+(?P<rfn_unit>day|week)s?\s+from\s+(?:now|today)\b)",
+    rf"(?P<weekday>\b(?:(?P<wd_mod>next|this|coming)\s+)?(?P<wd>{_WEEKDAY})\b)",
+    rf"(?P<day_month>\b(?P<dm_day>\d{{1,2}}){_ORDINAL}\s+(?:of\s+)?(?P<dm_month>{_MONTH})\b(?:,?\s+(?P<dm_year>\d{{4}})\b)?)",
+    rf"(?P<month_day>\b(?P<md_month>{_MONTH})\s+(?P<md_day>\d{{1,2}}){_ORDINAL}\b(?:,?\s+(?P<md_year>\d{{4}})\b)?)",
+    r"(?P<iso>\b(?P<iso_y>\d{4})[-/.](?P<iso_m>\d{1,2})[-/.](?P<iso_d>\d{1,2})\b)",
+    r"(?P<dmy>\b(?P<dmy_d>\d{1,2})[-/.](?P<dmy_m>\d{1,2})[-/.](?P<dmy_y>\d{4})\b)",
+]))
+
+
+def _number(word: str) -> int:
+    return int(word) if word.isdigit() else NUMBER_WORDS[word]
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _upcoming(month: int, day: int, year: Optional[str], today: date) -> Optional[date]:
+    # Without a year use this year, or next year if the date has passed
+    if year:
+        return _safe_date(int(year), month, day)
+    target = _safe_date(today.year, month, day)
+    if target is not None and target < today:
+        target = _safe_date(today.year + 1, month, day)
+    return target
+
+
+def _weekday(match, today: date) -> date:
+    days_ahead = (WEEKDAYS[match.group('wd')] - today.weekday()) % 7
+    # "this friday" on a Friday is today; "friday"/"next friday" is a week on
+    if days_ahead == 0 and match.group('wd_mod') != 'this':
+        days_ahead = 7
+    return today + timedelta(days=days_ahead)
+
+
+# Kind -> (priority, resolver). When a text holds several expressions the
+# lowest priority wins, then the leftmost, matching the original precedence.
+DATE_RESOLVERS: Dict[str, Tuple[int, Callable[..., Optional[date]]]] = {
+    'today': (0, lambda m, today: today),
+    'overmorrow': (1, lambda m, today: today + timedelta(days=2)),
+    'tomorrow': (1, lambda m, today: today + timedelta(days=1)),
+    'relative': (2, lambda m, today: today + timedelta(
+        days=_number(m.group('rel_n')) * UNIT_DAYS[m.group('rel_unit')])),
+    'relative_from_now': (2, lambda m, today: today + timedelta(
+        days=_number(m.group('rfn_n')) * UNIT_DAYS[m.group('rfn_unit')])),
+    'weekday': (3, _weekday),
+    'day_month': (4, lambda m, today: _upcoming(
+        MONTHS[m.group('dm_month')], int(m.group('dm_day')), m.group('dm_year'), today)),
+    'month_day': (4, lambda m, today: _upcoming(
+        MONTHS[m.group('md_month')], int(m.group('md_day')), m.group('md_year'), today)),
+    'iso': (5, lambda m, today: _safe_date(
+        int(m.group('iso_y')), int(m.group('iso_m')), int(m.group('iso_d')))),
+    'dmy': (5, lambda m, today: _safe_date(
+        int(m.group('dmy_y')), int(m.group('dmy_m')), int(m.group('dmy_d')))),
+}
+
 
 class Validators:
     @staticmethod
     def validate_email(email: str) -> bool:
         """Validate email format"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
-    
+        return EMAIL_PATTERN.match(email) is not None
+
     @staticmethod
     def validate_phone(phone: str) -> bool:
         """
@@ -19,105 +121,36 @@ class Validators:
         Where X is any digit, and the second digit is 6, 7, or 8.
         """
         # Strip out everything except digits and plus
-        clean = re.sub(r"[^\d+]", "", phone)
-
-        patterns = [
-            r"^\+9779[6-8]\d{8}$",  # +9779XXXXXXXXX
-            r"^9[6-8]\d{8}$",       # 9XXXXXXXXX
-            r"^09[6-8]\d{8}$",      # 09XXXXXXXXX
-        ]
-        return any(re.match(p, clean) for p in patterns)
-    
+        clean = PHONE_STRIP_PATTERN.sub("", phone)
+        return PHONE_PATTERN.match(clean) is not None
+
     @staticmethod
-    def parse_date_from_text(text: str) -> Optional[str]:
-        """Parse date from natural language text"""
-        text = text.lower().strip()
-        today = datetime.now()
-        
-        # Handle specific phrases
-        if 'today' in text:
-            return today.strftime('%Y-%m-%d')
-        elif 'tomorrow' in text:
-            return (today + timedelta(days=1)).strftime('%Y-%m-%d')
-        elif 'next monday' in text:
-            days_ahead = 0 - today.weekday()  # Monday is 0
-            if days_ahead <= 0:  # Target day already happened this week
-                days_ahead += 7
-            return (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
-        elif 'next tuesday' in text:
-            days_ahead = 1 - today.weekday()
-            if days_ahead <= 0:
-                days_ahead += 7
-            return (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
-        elif 'next wednesday' in text:
-            days_ahead = 2 - today.weekday()
-            if days_ahead <= 0:
-                days_ahead += 7
-            return (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
-        elif 'next thursday' in text:
-            days_ahead = 3 - today.weekday()
-            if days_ahead <= 0:
-                days_ahead += 7
-            return (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
-        elif 'next friday' in text:
-            days_ahead = 4 - today.weekday()
-            if days_ahead <= 0:
-                days_ahead += 7
-            return (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
-        
-        # Handle "26th may", "may 26", etc.
-        month_day_patterns = [
-            r'(\d{1,2})(?:st|nd|rd|th)?\s+(\w+)',  # "26th may"
-            r'(\w+)\s+(\d{1,2})(?:st|nd|rd|th)?',  # "may 26th"
-        ]
-        
-        months = {
-            'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3,
-            'april': 4, 'apr': 4, 'may': 5, 'june': 6, 'jun': 6,
-            'july': 7, 'jul': 7, 'august': 8, 'aug': 8, 'september': 9, 'sep': 9,
-            'october': 10, 'oct': 10, 'november': 11, 'nov': 11, 'december': 12, 'dec': 12
-        }
-        
-        for pattern in month_day_patterns:
-            match = re.search(pattern, text)
-            if match:
-                part1, part2 = match.groups()
-                
-                # Check which part is the month and which is the day
-                if part1.lower() in months:
-                    month = months[part1.lower()]
-                    try:
-                        day = int(part2)
-                    except ValueError:
-                        continue
-                elif part2.lower() in months:
-                    month = months[part2.lower()]
-                    try:
-                        day = int(part1)
-                    except ValueError:
-                        continue
-                else:
-                    continue
-                
-                # Use current year, but if the date has passed, use next year
-                year = today.year
-                try:
-                    target_date = datetime(year, month, day)
-                    if target_date < today:
-                        year += 1
-                        target_date = datetime(year, month, day)
-                    return target_date.strftime('%Y-%m-%d')
-                except ValueError:
-                    continue
-        
-        # Try to parse YYYY-MM-DD format
-        date_pattern = r'(\d{4}-\d{2}-\d{2})'
-        match = re.search(date_pattern, text)
-        if match:
-            try:
-                datetime.strptime(match.group(1), '%Y-%m-%d')
-                return match.group(1)
-            except ValueError:
-                pass
-        
-        return None
+    def parse_date_from_text(text: str, now: Optional[Union[date, datetime]] = None) -> Optional[str]:
+        """
+        Parse a date from natural language text as YYYY-MM-DD. Understands:
+          • today, tomorrow, day after tomorrow
+          • in 3 days, in a week, 2 weeks from now
+          • monday, next friday, this sunday
+          • 26th may, May 26, 26 May 2025
+          • 2024-12-25, 25/12/2024 (day first)
+        `now` defaults to the current date.
+        """
+        if now is None:
+            today = date.today()
+        elif isinstance(now, datetime):
+            today = now.date()
+        else:
+            today = now
+
+        best_priority, best_date = None, None
+        for match in DATE_PATTERN.finditer(text.lower()):
+            priority, resolve = DATE_RESOLVERS[match.lastgroup]
+            if best_priority is not None and priority >= best_priority:
+                continue
+            parsed = resolve(match, today)
+            if parsed is not None:
+                best_priority, best_date = priority, parsed
+                if priority == 0:
+                    break
+
+        return best_date.strftime('%Y-%m-%d') if best_date else None